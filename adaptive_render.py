@@ -0,0 +1,126 @@
+import statistics
+import cv2
+import fitz  # PyMuPDF renders clipped regions at any DPI
+import numpy as np
+from ocr_regions import preprocess_for_text
+
+# 📌 FIRST PASS (cheap preview used only for analysis)
+PREVIEW_DPI = 50
+
+# 📌 SECOND PASS DPI LIMITS
+MIN_DPI = 100
+MAX_DPI = 400
+DEFAULT_OCR_DPI = 300         # Used when no text height can be estimated
+TARGET_FONT_PX = 40           # Font size in pixels that tesseract reads reliably
+CAP_HEIGHT_RATIO = 0.7        # Capital letter height / font size
+DETECT_DPI_BY_DENSITY = ((0.02, 100), (0.06, 150), (1.0, 200))  # (max ink density, DPI)
+
+# 📌 REGION SELECTION
+CLUSTER_MARGIN_IN = 0.25      # Ink closer than this is rendered as one region
+MAX_REGIONS = 40              # More clusters than this: render one bounding region
+FULL_PAGE_COVERAGE = 0.6      # Regions covering more of the page: render one bounding region
+
+
+def _render_gray(page, dpi, clip=None):
+    pix = page.get_pixmap(dpi=dpi, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+    image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+    return image[:, :pix.width].copy()
+
+
+def _text_layer_font_size(page):
+    """Median font size (pt) of the PDF text layer, or None for scanned pages."""
+    sizes = [
+        span["size"]
+        for block in page.get_text("dict")["blocks"]
+        for line in block.get("lines", [])
+        for span in line["spans"]
+        if span["text"].strip()
+    ]
+    return statistics.median(sizes) if sizes else None
+
+
+def _preview_font_size(ink):
+    """Estimate font size (pt) from character-sized ink components in the preview."""
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    heights = heights[(heights >= 2) & (heights <= 30)]
+    if len(heights) == 0:
+        return None
+    cap_height_pt = float(np.median(heights)) * 72 / PREVIEW_DPI
+    return cap_height_pt / CAP_HEIGHT_RATIO
+
+
+# ✅ FUNCTION: Choose Second-Pass DPI
+def choose_dpi(font_size, ink_density, purpose="ocr"):
+    if purpose == "detect":
+        for max_density, dpi in DETECT_DPI_BY_DENSITY:
+            if ink_density <= max_density:
+                return dpi
+        return DETECT_DPI_BY_DENSITY[-1][1]
+
+    if not font_size:
+        return DEFAULT_OCR_DPI
+    dpi = TARGET_FONT_PX * 72 / font_size
+    return int(min(max(dpi, MIN_DPI), MAX_DPI))
+
+
+# ✅ FUNCTION: Analyze a Page at Low Resolution
+def analyze_page(page, purpose="ocr"):
+    """First pass: estimate text size, ink density and content regions of a page.
+
+    For OCR, long linework is removed before clustering so only text areas are
+    re-rendered; for detection all ink counts as content. Regions are returned
+    as fitz.Rect clips in PDF points.
+    """
+    preview = _render_gray(page, PREVIEW_DPI)
+    _, binary = cv2.threshold(preview, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    ink_density = float(np.count_nonzero(binary)) / binary.size
+    ink = preprocess_for_text(preview) if purpose == "ocr" else binary
+
+    font_size = None
+    if purpose == "ocr":
+        font_size = _text_layer_font_size(page) or _preview_font_size(ink)
+
+    margin = max(1, int(CLUSTER_MARGIN_IN * PREVIEW_DPI))
+    clusters = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (margin, margin)))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(clusters, connectivity=8)
+    boxes = stats[1:, :4].astype(float) * 72 / PREVIEW_DPI  # x, y, w, h in points
+
+    regions = []
+    if len(boxes):
+        covered = float((boxes[:, 2] * boxes[:, 3]).sum()) / (page.rect.width * page.rect.height)
+        if len(boxes) > MAX_REGIONS or covered > FULL_PAGE_COVERAGE:
+            x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+            x1, y1 = (boxes[:, 0] + boxes[:, 2]).max(), (boxes[:, 1] + boxes[:, 3]).max()
+            boxes = np.array([[x0, y0, x1 - x0, y1 - y0]])
+        for x, y, w, h in boxes:
+            regions.append(fitz.Rect(x, y, x + w, y + h) & page.rect)
+
+    return {
+        "font_size": font_size,
+        "ink_density": ink_density,
+        "dpi": choose_dpi(font_size, ink_density, purpose),
+        "regions": regions,
+    }
+
+
+# ✅ FUNCTION: Render Only the Needed Regions
+def render_page_regions(page, purpose="ocr"):
+    """Yield (clip, dpi, image) for each content region at the DPI it needs."""
+    info = analyze_page(page, purpose)
+    for clip in info["regions"]:
+        yield clip, info["dpi"], _render_gray(page, info["dpi"], clip)
+
+
+# ✅ FUNCTION: Adaptive Two-Pass Rendering of a PDF
+def render_pdf_adaptive(pdf_path, purpose="ocr", pages=None):
+    """Yield (page_number, clip, dpi, image) one region at a time; `pages` limits which pages."""
+    with fitz.open(pdf_path) as doc:
+        for page_number, page in enumerate(doc, start=1):
+            if pages is not None and page_number not in pages:
+                continue
+            rendered = 0
+            for clip, dpi, image in render_page_regions(page, purpose):
+                rendered += image.size
+                yield page_number, clip, dpi, image
+            print(f"🖨️ Page {page_number}: rendered {rendered / 1e6:.1f} MP for {purpose}")
@@ -0,0 +1,266 @@
+import math
+import numpy as np
+import pandas as pd
+from ezdxf.entities.boundary_paths import BoundaryPathType, EdgeType
+from ezdxf.lldxf import const
+from ezdxf.math import arc_angle_span_deg
+
+# 📌 CURVE APPROXIMATION (segments per full curve)
+ELLIPSE_SEGMENTS = 128
+SPLINE_SEGMENTS = 64
+
+AREA_COLUMNS = ["Gross Area (sq ft)", "Hole Area (sq ft)", "Area (sq ft)", "Perimeter (ft)"]
+BOUNDS_COLUMNS = ["Min X", "Min Y", "Max X", "Max Y"]
+
+
+# ✅ FUNCTION: Gather Closed Boundaries into Flat Arrays
+def collect_boundaries(entities):
+    """Gather closed boundaries of DXF entities into flat vertex arrays.
+
+    Every boundary ring is stored as consecutive (x, y, bulge) vertices where
+    the bulge describes the arc from a vertex to the next one. Circles become
+    two half-circle bulge segments, ellipses and splines are flattened.
+    Returns the entity records and a dict of NumPy arrays.
+    """
+    records = []
+    xs, ys, bulges, ring_ids = [], [], [], []
+    ring_owner, ring_is_hole = [], []
+
+    for entity in entities:
+        rings = _entity_rings(entity)
+        if not rings:
+            continue
+
+        owner = len(records)
+        records.append({
+            "Entity": entity.dxftype(),
+            "Layer": entity.dxf.layer,
+            "Handle": entity.dxf.get("handle"),
+        })
+        for points, is_hole in rings:
+            ring_index = len(ring_owner)
+            for x, y, bulge in points:
+                xs.append(x)
+                ys.append(y)
+                bulges.append(bulge)
+            ring_ids.extend([ring_index] * len(points))
+            ring_owner.append(owner)
+            ring_is_hole.append(is_hole)
+
+    arrays = {
+        "x": np.asarray(xs, dtype=float),
+        "y": np.asarray(ys, dtype=float),
+        "bulge": np.asarray(bulges, dtype=float),
+        "ring": np.asarray(ring_ids, dtype=np.int64),
+        "ring_owner": np.asarray(ring_owner, dtype=np.int64),
+        "ring_is_hole": np.asarray(ring_is_hole, dtype=bool),
+    }
+    return records, arrays
+
+
+def _entity_rings(entity):
+    """Return [(points, is_hole), ...] for a closed entity, [] otherwise."""
+    dxftype = entity.dxftype()
+    if dxftype == "LWPOLYLINE":
+        points = list(entity.get_points("xyb"))
+        if len(points) > 2 and (entity.closed or points[0][:2] == points[-1][:2]):
+            return [(points, False)]
+    elif dxftype == "POLYLINE":
+        if entity.is_2d_polyline and entity.is_closed and len(entity) > 2:
+            points = [(v.dxf.location.x, v.dxf.location.y, v.dxf.bulge) for v in entity.vertices]
+            return [(points, False)]
+    elif dxftype == "CIRCLE":
+        cx, cy = entity.dxf.center.x, entity.dxf.center.y
+        r = entity.dxf.radius
+        return [([(cx - r, cy, 1.0), (cx + r, cy, 1.0)], False)]
+    elif dxftype == "ELLIPSE":
+        ellipse = entity.construction_tool()
+        if math.isclose(ellipse.param_span, math.tau):
+            params = np.linspace(0.0, math.tau, ELLIPSE_SEGMENTS, endpoint=False)
+            return [([(v.x, v.y, 0.0) for v in ellipse.vertices(params)], False)]
+    elif dxftype == "HATCH":
+        return _hatch_rings(entity)
+    return []
+
+
+def _hatch_rings(hatch):
+    """Return hatch boundary paths; every path but the external ones is a hole.
+
+    OUTERMOST paths are islands inside the external path, so they are holes too.
+    Without an external flag the first path is the outer boundary.
+    """
+    paths = list(hatch.paths)
+    has_outer = any(p.path_type_flags & const.BOUNDARY_PATH_EXTERNAL for p in paths)
+    rings = []
+    for index, path in enumerate(paths):
+        if path.type == BoundaryPathType.POLYLINE:
+            points = [(x, y, bulge) for x, y, bulge in path.vertices]
+        else:
+            points = _edge_path_points(path)
+        if len(points) < 2:
+            continue
+        if has_outer:
+            is_hole = not path.path_type_flags & const.BOUNDARY_PATH_EXTERNAL
+        else:
+            is_hole = index > 0
+        rings.append((points, is_hole))
+    return rings
+
+
+def _edge_path_points(path):
+    """Convert a hatch edge path into (x, y, bulge) vertices."""
+    points = []
+    for edge in path.edges:
+        if edge.type == EdgeType.LINE:
+            points.append((edge.start.x, edge.start.y, 0.0))
+        elif edge.type == EdgeType.ARC:
+            span = math.radians(arc_angle_span_deg(edge.start_angle, edge.end_angle))
+            bulge = math.tan(span / 4) if edge.ccw else -math.tan(span / 4)
+            start = edge.real_start_point
+            points.append((start.x, start.y, bulge))
+        elif edge.type == EdgeType.ELLIPSE:
+            ellipse = edge.construction_tool()
+            count = max(2, int(ELLIPSE_SEGMENTS * ellipse.param_span / math.tau))
+            vertices = list(ellipse.vertices(ellipse.params(count + 1)))
+            if not edge.ccw:
+                vertices.reverse()
+            points.extend((v.x, v.y, 0.0) for v in vertices[:-1])
+        elif edge.type == EdgeType.SPLINE:
+            vertices = list(edge.construction_tool().approximate(SPLINE_SEGMENTS))
+            points.extend((v.x, v.y, 0.0) for v in vertices[:-1])
+    return points
+
+
+# ✅ FUNCTION: Vectorized Ring Areas and Perimeters
+def compute_ring_metrics(x, y, bulge, ring, ring_count):
+    """Return (area, perimeter) per ring with one shoelace/arc-segment pass."""
+    n = len(x)
+    if n == 0:
+        return np.zeros(ring_count), np.zeros(ring_count)
+
+    nxt = _next_vertex(ring)
+    chord = np.hypot(x[nxt] - x, y[nxt] - y)
+    cross = x * y[nxt] - x[nxt] * y
+
+    # Bulge = tan(theta / 4); the circular segment between chord and arc
+    theta = 4.0 * np.arctan(bulge)
+    is_arc = bulge != 0.0
+    half_sin = np.abs(np.sin(theta / 2.0))
+    radius = np.divide(chord, 2.0 * half_sin, out=np.zeros(n), where=is_arc)
+    segment_area = 0.5 * radius ** 2 * (theta - np.sin(theta))
+    segment_length = np.where(is_arc, radius * np.abs(theta), chord)
+
+    signed_area = (0.5 * np.bincount(ring, weights=cross, minlength=ring_count)
+                   + np.bincount(ring, weights=segment_area, minlength=ring_count))
+    perimeter = np.bincount(ring, weights=segment_length, minlength=ring_count)
+    return np.abs(signed_area), perimeter
+
+
+# ✅ FUNCTION: Vectorized Ring Bounding Boxes
+def compute_ring_bounds(x, y, bulge, ring, ring_count):
+    """Return (min_x, min_y, max_x, max_y) per ring, arcs bounded by their circle."""
+    bounds = [np.full(ring_count, np.inf), np.full(ring_count, np.inf),
+              np.full(ring_count, -np.inf), np.full(ring_count, -np.inf)]
+    if len(x) == 0:
+        return tuple(bounds)
+
+    nxt = _next_vertex(ring)
+    seg_min_x, seg_max_x = np.minimum(x, x[nxt]), np.maximum(x, x[nxt])
+    seg_min_y, seg_max_y = np.minimum(y, y[nxt]), np.maximum(y, y[nxt])
+
+    # Arc segments: use the bounding box of the full circle they lie on
+    is_arc = bulge != 0.0
+    b = np.where(is_arc, bulge, 1.0)
+    dx, dy = x[nxt] - x, y[nxt] - y
+    k = (1.0 - b ** 2) / (4.0 * b)
+    cx = (x + x[nxt]) / 2.0 - k * dy
+    cy = (y + y[nxt]) / 2.0 + k * dx
+    radius = np.hypot(x - cx, y - cy)
+    seg_min_x = np.where(is_arc, cx - radius, seg_min_x)
+    seg_max_x = np.where(is_arc, cx + radius, seg_max_x)
+    seg_min_y = np.where(is_arc, cy - radius, seg_min_y)
+    seg_max_y = np.where(is_arc, cy + radius, seg_max_y)
+
+    np.minimum.at(bounds[0], ring, seg_min_x)
+    np.minimum.at(bounds[1], ring, seg_min_y)
+    np.maximum.at(bounds[2], ring, seg_max_x)
+    np.maximum.at(bounds[3], ring, seg_max_y)
+    return tuple(bounds)
+
+
+def _next_vertex(ring):
+    """Index of the next vertex, wrapping the last vertex of each ring to its first."""
+    n = len(ring)
+    starts = np.flatnonzero(np.r_[True, ring[1:] != ring[:-1]])
+    ends = np.r_[starts[1:], n]
+    nxt = np.arange(1, n + 1)
+    nxt[ends - 1] = starts
+    return nxt
+
+
+# ✅ FUNCTION: Net Areas per Entity
+def compute_entity_areas(entities, scale_factor=1.0):
+    """Return a DataFrame of gross, hole and net areas plus perimeters per entity.
+
+    Areas and perimeters are scaled to feet; the bounding box columns stay in
+    drawing units so they can be matched against label coordinates.
+    """
+    records, arrays = collect_boundaries(entities)
+    df = pd.DataFrame(records, columns=["Entity", "Layer", "Handle"])
+    if df.empty:
+        return df.assign(**{column: [] for column in AREA_COLUMNS + BOUNDS_COLUMNS})
+
+    owner = arrays["ring_owner"]
+    is_hole = arrays["ring_is_hole"]
+    area, perimeter = compute_ring_metrics(
+        arrays["x"], arrays["y"], arrays["bulge"], arrays["ring"], len(owner)
+    )
+
+    area_scale = scale_factor ** 2
+    gross = np.bincount(owner, weights=np.where(is_hole, 0.0, area), minlength=len(df))
+    holes = np.bincount(owner, weights=np.where(is_hole, area, 0.0), minlength=len(df))
+    df["Gross Area (sq ft)"] = gross * area_scale
+    df["Hole Area (sq ft)"] = holes * area_scale
+    df["Area (sq ft)"] = np.maximum(gross - holes, 0.0) * area_scale
+    df["Perimeter (ft)"] = np.bincount(owner, weights=perimeter, minlength=len(df)) * scale_factor
+
+    # Entity bounds come from its outer rings only
+    ring_bounds = compute_ring_bounds(
+        arrays["x"], arrays["y"], arrays["bulge"], arrays["ring"], len(owner)
+    )
+    outer = ~is_hole
+    for column, values, reduce in zip(BOUNDS_COLUMNS, ring_bounds, (np.minimum, np.minimum, np.maximum, np.maximum)):
+        entity_values = np.full(len(df), np.inf if reduce is np.minimum else -np.inf)
+        reduce.at(entity_values, owner[outer], values[outer])
+        df[column] = entity_values
+    return df
+
+
+# ✅ FUNCTION: Locate Points in Boundaries
+def locate_points(px, py, area_df, chunk_size=256, area_column="Gross Area (sq ft)"):
+    """Return, for each point, the index of the smallest boundary whose bounds contain it (-1 if none)."""
+    px = np.asarray(px, dtype=float)
+    py = np.asarray(py, dtype=float)
+    found = np.full(len(px), -1, dtype=np.int64)
+    if area_df.empty or len(px) == 0:
+        return found
+
+    min_x, min_y, max_x, max_y = (area_df[c].to_numpy(dtype=float) for c in BOUNDS_COLUMNS)
+    area = area_df[area_column].to_numpy(dtype=float)
+    for start in range(0, len(px), chunk_size):
+        x = px[start:start + chunk_size, None]
+        y = py[start:start + chunk_size, None]
+        inside = (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+        candidate_area = np.where(inside, area, np.inf)
+        best = np.argmin(candidate_area, axis=1)
+        hit = inside[np.arange(len(best)), best]
+        found[start:start + chunk_size] = np.where(hit, best, -1)
+    return found
+
+
+# ✅ FUNCTION: Group Areas by Layer
+def summarize_areas_by_layer(area_df):
+    """Sum net areas and perimeters per layer."""
+    summary = area_df.groupby("Layer")[AREA_COLUMNS].sum()
+    summary["Entities"] = area_df.groupby("Layer").size()
+    return summary.reset_index()
@@ -0,0 +1,90 @@
+import io
+import ezdxf
+from ezdxf.addons import iterdxf
+from ezdxf.filemanagement import dxf_file_info
+
+# 📌 ENTITY TYPES NEEDED BY EACH EXTRACTOR
+ROOM_ENTITY_TYPES = ("TEXT", "MTEXT")
+AREA_ENTITY_TYPES = ("LWPOLYLINE", "POLYLINE", "CIRCLE", "ELLIPSE", "HATCH")
+LINEAR_ENTITY_TYPES = ("LINE", "LWPOLYLINE", "POLYLINE")
+MATERIAL_ENTITY_TYPES = None  # Material layers can be on any entity type
+
+# Nested block references deeper than this are not exploded
+MAX_BLOCK_DEPTH = 8
+
+
+# ✅ FUNCTION: Read DXF Units Without Loading the Document
+def read_dxf_units(dxf_path):
+    """Return the $INSUNITS code (0 = unitless) by scanning only the HEADER section."""
+    return dxf_file_info(dxf_path).insert_units or 0
+
+
+# ✅ FUNCTION: Check for Block References
+def has_block_references(dxf_path):
+    """Return True if the modelspace contains at least one INSERT entity."""
+    for _ in iterdxf.modelspace(dxf_path, types=["INSERT"]):
+        return True
+    return False
+
+
+# ✅ FUNCTION: Load Block Definitions Without the Modelspace
+def read_dxf_blocks(dxf_path):
+    """Load a DXF document with an empty ENTITIES section.
+
+    Block definitions, tables and objects are kept, so block contents (and
+    nested INSERTs inside them) can be read while modelspace entities stay on
+    disk. Only ASCII DXF files are supported, like iterdxf.
+    """
+    encoding = dxf_file_info(dxf_path).encoding
+    kept = []
+    in_entities = False
+    previous = None
+    with open(dxf_path, encoding=encoding, errors="surrogateescape") as f:
+        for code in f:
+            value = f.readline()
+            tag = (code.strip(), value.strip())
+            if in_entities and tag != ("0", "ENDSEC"):
+                continue
+            in_entities = previous == ("0", "SECTION") and tag == ("2", "ENTITIES")
+            kept += [code, value]
+            previous = tag
+    return ezdxf.read(io.StringIO("".join(kept)))
+
+
+# ✅ FUNCTION: Stream Modelspace Entities
+def iter_modelspace(dxf_path, types=None, resolve_blocks=False):
+    """Yield modelspace entities of the given DXF types in constant memory.
+
+    Entities are read one at a time with ezdxf's iterdxf add-on. When
+    `resolve_blocks` is set and the drawing contains INSERTs, the document is
+    loaded fully instead so block contents can be exploded into the stream.
+    """
+    if resolve_blocks and has_block_references(dxf_path):
+        print(f"🧱 Block references found, loading full DXF: {dxf_path}")
+        yield from _iter_resolved_modelspace(dxf_path, types)
+        return
+
+    yield from iterdxf.modelspace(dxf_path, types=types)
+
+
+def _iter_resolved_modelspace(dxf_path, types):
+    """Yield modelspace entities with block references exploded."""
+    doc = ezdxf.readfile(dxf_path)
+    wanted = set(types) if types else None
+    for entity in doc.modelspace():
+        yield from _explode(entity, wanted, depth=0)
+
+
+def _explode(entity, wanted, depth):
+    """Yield `entity` and, for INSERTs, its attributes and block contents."""
+    if wanted is None or entity.dxftype() in wanted:
+        yield entity
+
+    if entity.dxftype() != "INSERT" or depth >= MAX_BLOCK_DEPTH:
+        return
+
+    for attrib in entity.attribs:
+        if wanted is None or "ATTRIB" in wanted:
+            yield attrib
+    for child in entity.virtual_entities():
+        yield from _explode(child, wanted, depth + 1)
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+from symbol_counter import assign_rooms, UNASSIGNED
+
+# 📌 MERGE TOLERANCES
+ANGLE_TOLERANCE_DEG = 0.5     # Segments within this angle share a direction
+COLLINEAR_TOLERANCE_FT = 0.05 # Max offset between segments on the same line (and max gap bridged)
+
+# 📌 DOUBLE-LINE WALLS
+MIN_WALL_THICKNESS_IN = 2.0
+MAX_WALL_THICKNESS_IN = 16.0
+MIN_WALL_OVERLAP_FT = 1.0     # Face lines must run side by side at least this far
+MAX_WALL_CANDIDATES = 32      # Parallel lines checked per face line
+
+RUN_COLUMNS = ["Layer", "Angle (deg)", "Offset", "Start", "End", "X0", "Y0", "X1", "Y1",
+               "Segments", "Raw Length (ft)", "Length (ft)"]
+WALL_COLUMNS = ["Layer", "Room Name", "X0", "Y0", "X1", "Y1", "Length (ft)", "Thickness (in)"]
+
+
+# ✅ FUNCTION: Segments from DXF Entities
+def segments_from_entities(entities):
+    """Return (segments (N, 4), layers) for LINE, LWPOLYLINE and POLYLINE entities.
+
+    Polyline arcs are reduced to their chords; walls are straight.
+    """
+    coords, layers = [], []
+    for entity in entities:
+        dxftype = entity.dxftype()
+        if dxftype == "LINE":
+            start, end = entity.dxf.start, entity.dxf.end
+            points = [(start.x, start.y), (end.x, end.y)]
+        elif dxftype == "LWPOLYLINE":
+            points = [tuple(p) for p in entity.get_points("xy")]
+            if entity.closed and len(points) > 2:
+                points.append(points[0])
+        elif dxftype == "POLYLINE" and entity.is_2d_polyline:
+            points = [(p.x, p.y) for p in entity.points()]
+            if entity.is_closed and len(points) > 2:
+                points.append(points[0])
+        else:
+            continue
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            coords.append((x0, y0, x1, y1))
+            layers.append(entity.dxf.layer)
+    return np.asarray(coords, dtype=float).reshape(-1, 4), np.asarray(layers, dtype=object)
+
+
+# ✅ FUNCTION: Segments from a PDF Page
+def page_segments(page, drawings=None):
+    """Return (segments (N, 4), layers) of the straight lines on a page.
+
+    The layer is the optional-content layer of the path, or its stroke width
+    (walls are usually drawn heavier than annotation lines).
+    """
+    if drawings is None:
+        drawings = page.get_drawings()
+    coords, layers = [], []
+    for path in drawings:
+        layer = path.get("layer") or f"Width {path.get('width') or 0:.2f}"
+        for item in path["items"]:
+            kind = item[0]
+            if kind == "l":
+                coords.append((item[1].x, item[1].y, item[2].x, item[2].y))
+                layers.append(layer)
+            elif kind in ("re", "qu"):
+                quad = item[1].quad if kind == "re" else item[1]
+                corners = [quad.ul, quad.ur, quad.lr, quad.ll]
+                for i in range(4):
+                    p, q = corners[i], corners[(i + 1) % 4]
+                    coords.append((p.x, p.y, q.x, q.y))
+                    layers.append(layer)
+    return np.asarray(coords, dtype=float).reshape(-1, 4), np.asarray(layers, dtype=object)
+
+
+# ✅ FUNCTION: Merge Collinear and Overlapping Segments
+def merge_collinear(segments, layers, scale_factor=1.0):
+    """Merge segments that lie on the same line of the same layer into runs.
+
+    Segments are binned by layer, direction and offset from the origin, sorted
+    along the line, and swept once: a new run starts wherever a segment begins
+    beyond the furthest end reached so far (plus the tolerance). No pairwise
+    comparison is made. Lengths are reported in feet (`scale_factor` = feet
+    per drawing unit); coordinates stay in drawing units.
+    """
+    segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+    layers = np.asarray(layers, dtype=object)
+    dx, dy = segments[:, 2] - segments[:, 0], segments[:, 3] - segments[:, 1]
+    length = np.hypot(dx, dy)
+    keep = length > 1e-9
+    if not keep.any():
+        return pd.DataFrame(columns=RUN_COLUMNS)
+    segments, layers, dx, dy, length = segments[keep], layers[keep], dx[keep], dy[keep], length[keep]
+
+    # Snap each direction to a bin so nearly parallel segments share one axis
+    bin_count = int(round(180 / ANGLE_TOLERANCE_DEG))
+    step = np.pi / bin_count
+    angle_bin = np.rint(np.mod(np.arctan2(dy, dx), np.pi) / step).astype(np.int64) % bin_count
+    ux, uy = np.cos(angle_bin * step), np.sin(angle_bin * step)
+
+    t_a = segments[:, 0] * ux + segments[:, 1] * uy
+    t_b = segments[:, 2] * ux + segments[:, 3] * uy
+    mid_x, mid_y = (segments[:, 0] + segments[:, 2]) / 2, (segments[:, 1] + segments[:, 3]) / 2
+    offset = mid_y * ux - mid_x * uy
+    tolerance = COLLINEAR_TOLERANCE_FT / scale_factor
+    offset_bin = np.rint(offset / tolerance).astype(np.int64)
+    layer_codes, layer_names = pd.factorize(layers)
+
+    order = np.lexsort((np.minimum(t_a, t_b), offset_bin, angle_bin, layer_codes))
+    layer_codes, angle_bin, offset_bin = layer_codes[order], angle_bin[order], offset_bin[order]
+    t0, t1 = np.minimum(t_a, t_b)[order], np.maximum(t_a, t_b)[order]
+    offset, length = offset[order], length[order]
+
+    # Sweep: a run continues while the next start is within reach of the run so far
+    line_start = np.r_[True, (layer_codes[1:] != layer_codes[:-1]) | (angle_bin[1:] != angle_bin[:-1])
+                       | (offset_bin[1:] != offset_bin[:-1])]
+    reach = pd.Series(t1).groupby(np.cumsum(line_start)).cummax().to_numpy()
+    run_start = line_start | (t0 > np.r_[-np.inf, reach[:-1]] + tolerance)
+    starts = np.flatnonzero(run_start)
+
+    run_t0 = t0[starts]
+    run_t1 = np.maximum.reduceat(t1, starts)
+    raw = np.add.reduceat(length, starts)
+    run_offset = np.add.reduceat(offset * length, starts) / raw
+    run_ux, run_uy = ux[order][starts], uy[order][starts]
+
+    return pd.DataFrame({
+        "Layer": layer_names[layer_codes[starts]],
+        "Angle (deg)": angle_bin[starts] * step * 180 / np.pi,
+        "Offset": run_offset,
+        "Start": run_t0,
+        "End": run_t1,
+        "X0": run_t0 * run_ux - run_offset * run_uy,
+        "Y0": run_t0 * run_uy + run_offset * run_ux,
+        "X1": run_t1 * run_ux - run_offset * run_uy,
+        "Y1": run_t1 * run_uy + run_offset * run_ux,
+        "Segments": np.diff(np.r_[starts, len(t0)]),
+        "Raw Length (ft)": raw * scale_factor,
+        "Length (ft)": (run_t1 - run_t0) * scale_factor,
+    }, columns=RUN_COLUMNS)
+
+
+def _one_to_one(i, j, count):
+    """Positions of the pairs kept when taking (i, j) in order and skipping runs already used."""
+    used = np.zeros(count, dtype=bool)
+    keep = []
+    for position, (a, b) in enumerate(zip(i.tolist(), j.tolist())):
+        if not used[a] and not used[b]:
+            used[a] = used[b] = True
+            keep.append(position)
+    return np.array(keep, dtype=int)
+
+
+# ✅ FUNCTION: Pair Parallel Lines into Walls
+def pair_walls(runs, scale_factor=1.0):
+    """Find double-line walls: parallel runs of one layer that sit a wall thickness apart.
+
+    Runs are sorted by offset within each layer and direction; every run is
+    compared only with the following runs inside the thickness window. Pairs
+    are then taken greedily, longest side-by-side overlap (then thinnest gap)
+    first, and each run belongs to at most one wall. Returns centerlines with
+    their length (ft) and thickness (in).
+    """
+    if len(runs) < 2:
+        return pd.DataFrame(columns=WALL_COLUMNS)
+
+    runs = runs.sort_values(["Layer", "Angle (deg)", "Offset"], kind="mergesort")
+    group = runs.groupby(["Layer", "Angle (deg)"], sort=False).ngroup().to_numpy()
+    offset, start, end = (runs[c].to_numpy(dtype=float) for c in ("Offset", "Start", "End"))
+    min_gap = MIN_WALL_THICKNESS_IN / 12 / scale_factor
+    max_gap = MAX_WALL_THICKNESS_IN / 12 / scale_factor
+    min_overlap = MIN_WALL_OVERLAP_FT / scale_factor
+
+    # Sweep forward k runs at a time; a run drops out once the k-th next run is
+    # in another group or further away than the thickest wall
+    left, right = [], []
+    active = np.arange(len(runs))
+    for k in range(1, MAX_WALL_CANDIDATES + 1):
+        active = active[active + k < len(runs)]
+        active = active[(group[active + k] == group[active]) & (offset[active + k] - offset[active] <= max_gap)]
+        if len(active) == 0:
+            break
+        left.append(active)
+        right.append(active + k)
+    if not left:
+        return pd.DataFrame(columns=WALL_COLUMNS)
+    i, j = np.concatenate(left), np.concatenate(right)
+
+    gap = offset[j] - offset[i]
+    overlap = np.minimum(end[i], end[j]) - np.maximum(start[i], start[j])
+    ok = (gap >= min_gap) & (gap <= max_gap) & (overlap >= min_overlap)
+    pairs = pd.DataFrame({"i": i[ok], "j": j[ok], "gap": gap[ok], "overlap": overlap[ok]})
+    pairs = pairs.sort_values(["overlap", "gap"], ascending=[False, True], kind="mergesort")
+    pairs = pairs.iloc[_one_to_one(pairs["i"].to_numpy(), pairs["j"].to_numpy(), len(runs))]
+    i, j = pairs["i"].to_numpy(), pairs["j"].to_numpy()
+
+    angle = np.radians(runs["Angle (deg)"].to_numpy(dtype=float)[i])
+    ux, uy = np.cos(angle), np.sin(angle)
+    center = (offset[i] + offset[j]) / 2
+    wall_start, wall_end = np.maximum(start[i], start[j]), np.minimum(end[i], end[j])
+    return pd.DataFrame({
+        "Layer": runs["Layer"].to_numpy()[i],
+        "Room Name": UNASSIGNED,
+        "X0": wall_start * ux - center * uy,
+        "Y0": wall_start * uy + center * ux,
+        "X1": wall_end * ux - center * uy,
+        "Y1": wall_end * uy + center * ux,
+        "Length (ft)": (wall_end - wall_start) * scale_factor,
+        "Thickness (in)": pairs["gap"].to_numpy() * scale_factor * 12,
+    }, columns=WALL_COLUMNS)
+
+
+# ✅ FUNCTION: Linear Takeoff (runs, walls, totals per layer and room)
+def linear_takeoff(segments, layers, scale_factor=1.0, labels=None, boundaries=None,
+                   area_column="Gross Area (sq ft)"):
+    """Merge segments, pair walls and total lengths per layer and per room.
+
+    `labels` (Text, X, Y, Size) and `boundaries` (bounds columns) place runs
+    and walls in rooms by their midpoints. Returns (runs, walls, layer
+    summary, room summary) DataFrames.
+    """
+    runs = merge_collinear(segments, layers, scale_factor)
+    walls = pair_walls(runs, scale_factor)
+
+    runs.insert(1, "Room Name", UNASSIGNED)
+    if labels is not None and boundaries is not None:
+        # Walls and their face lines straddle the room outline
+        margin = MAX_WALL_THICKNESS_IN / 12 / scale_factor
+        for df in (runs, walls):
+            df["Room Name"] = assign_rooms((df["X0"] + df["X1"]) / 2, (df["Y0"] + df["Y1"]) / 2,
+                                           labels, boundaries, area_column, margin)
+
+    line_totals = runs.groupby("Layer").agg(**{
+        "Raw Length (ft)": ("Raw Length (ft)", "sum"), "Line Length (ft)": ("Length (ft)", "sum")})
+    wall_totals = walls.groupby("Layer").agg(**{
+        "Wall Length (ft)": ("Length (ft)", "sum"), "Walls": ("Length (ft)", "size"),
+        "Mean Thickness (in)": ("Thickness (in)", "mean")})
+    layer_summary = line_totals.join(wall_totals, how="left").fillna({"Wall Length (ft)": 0.0, "Walls": 0})
+    layer_summary = layer_summary.sort_values("Line Length (ft)", ascending=False).reset_index()
+
+    room_lines = runs.groupby(["Room Name", "Layer"])["Length (ft)"].sum().rename("Line Length (ft)")
+    room_walls = walls.groupby(["Room Name", "Layer"])["Length (ft)"].sum().rename("Wall Length (ft)")
+    room_summary = pd.concat([room_lines, room_walls], axis=1).fillna(0.0).reset_index()
+
+    print(f"📏 {len(segments)} segments → {len(runs)} runs, {len(walls)} double-line walls "
+          f"({walls['Length (ft)'].sum():.1f} ft)")
+    return runs, walls, layer_summary, room_summary
@@ -1,19 +1,160 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
 import os
-import subprocess
-
-scripts = [
-    "extract_text.py",
-    "extract_tables.py",
-    "extract_ocr.py",
-    "extract_vector.py",
-    "extract_cad.py",
-    "material_estimation.py",
-    "generate_report.py"
-]
-
-for script in scripts:
-    print(f"\nRunning {script}...\n")
-    result = subprocess.run(["python", f"scripts/{script}"], capture_output=True, text=True)
-    print(result.stdout)
-    if result.returncode != 0:
-        print(f"❌ Error running {script}: {result.stderr}")
+import merge  # Light: heavy dependencies load inside the functions each subcommand calls
+
+# 🛠️ CONFIGURATION
+DATA_FOLDER = "data"
+STARTUP_BUDGET_S = 0.5  # Launch to subcommand dispatch (keep heavy imports out of module level)
+
+PDF = (".pdf",)
+DXF = (".dxf",)
+IMAGES = (".jpg", ".jpeg", ".png")
+
+
+# ✅ FUNCTION: Collect Input Files
+def find_inputs(paths, extensions):
+    """Expand files and folders (default: data/) into input files with the given extensions."""
+    files = []
+    for path in paths or [DATA_FOLDER]:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith(extensions))
+        elif path.lower().endswith(extensions):
+            files.append(path)
+    return files
+
+
+def _stage_pages(pdf_path, output_folder, stage):
+    sheets = merge.classify_pdf_sheets(pdf_path, output_folder)
+    return merge.pages_for_stage(sheets, stage)
+
+
+def _base_path(path, output_folder, suffix):
+    return os.path.join(output_folder, os.path.splitext(os.path.basename(path))[0] + suffix)
+
+
+# ✅ SUBCOMMANDS
+def cmd_extract_text(args):
+    """Text layer and parsed schedules of each PDF (PyMuPDF + pdfplumber only)."""
+    for pdf_path in find_inputs(args.inputs, PDF):
+        merge.extract_vector_from_pdf(pdf_path, args.output)
+        merge.extract_schedules_from_pdf(pdf_path, args.output, pages=_stage_pages(pdf_path, args.output, "tables"))
+
+
+def cmd_extract_cad(args):
+    """Rooms, areas, symbols and wall lengths from DXFs, and the vector geometry of PDFs (no OCR, no YOLO)."""
+    rates = merge.load_material_rates(args.rates)
+    for dxf_path in find_inputs(args.inputs, DXF):
+        scale_factor = merge.detect_dxf_units(dxf_path)
+        room_df = merge.extract_rooms_from_dxf(dxf_path, output_folder=args.output)
+        merge.extract_materials_from_dxf(dxf_path, output_folder=args.output)
+        area_df = merge.extract_areas_from_dxf(dxf_path, output_folder=args.output, scale_factor=scale_factor)
+        merge.count_symbols_in_dxf(dxf_path, room_df, area_df, output_folder=args.output, scale_factor=scale_factor)
+        room_lengths = merge.extract_linear_takeoff_from_dxf(dxf_path, room_df, area_df, output_folder=args.output,
+                                                             scale_factor=scale_factor)
+        merge.estimate_wall_materials(room_lengths, rates).to_csv(
+            _base_path(dxf_path, args.output, "_cad_wall_material_estimation.csv"), index=False)
+        merge.estimate_room_materials(room_df, area_df, rates).to_csv(
+            _base_path(dxf_path, args.output, "_room_material_estimation.csv"), index=False)
+
+    for pdf_path in find_inputs(args.inputs, PDF):
+        sheets = merge.classify_pdf_sheets(pdf_path, args.output)
+        merge.extract_measurements_from_pdf(pdf_path, args.output, pages=merge.pages_for_stage(sheets, "measure"))
+        merge.count_symbols_in_pdf(pdf_path, args.output, pages=merge.pages_for_stage(sheets, "symbols"))
+        room_lengths = merge.extract_linear_takeoff_from_pdf(pdf_path, args.output,
+                                                             pages=merge.pages_for_stage(sheets, "walls"))
+        merge.estimate_wall_materials(room_lengths, rates).to_csv(
+            _base_path(pdf_path, args.output, "_pdf_wall_material_estimation.csv"), index=False)
+
+
+def cmd_ocr(args):
+    for pdf_path in find_inputs(args.inputs, PDF):
+        merge.extract_ocr_from_pdf(pdf_path, args.output, mode=args.mode,
+                                   pages=_stage_pages(pdf_path, args.output, "ocr"))
+
+
+def cmd_detect(args):
+    import object_detection
+    if args.model:
+        object_detection.MODEL_PATH = args.model
+    for image_path in find_inputs(args.inputs, IMAGES):
+        object_detection.detect_objects(image_path, os.path.join(args.output, f"detected_{os.path.basename(image_path)}"))
+    for pdf_path in find_inputs(args.inputs, PDF):
+        object_detection.detect_objects_in_pdf(pdf_path, args.output, pages=_stage_pages(pdf_path, args.output, "detect"))
+
+
+def cmd_estimate(args):
+    """Material totals from area CSVs written by extract-cad (default: every *_area.csv in the output folder)."""
+    rates = merge.load_material_rates(args.rates)
+    area_files = args.inputs or [os.path.join(args.output, f) for f in sorted(os.listdir(args.output))
+                                 if f.endswith(("_cad_area.csv", "_pdf_area.csv"))]
+    if not area_files:
+        print("❌ No area CSVs found. Run `python main.py extract-cad` first.")
+    for area_file in area_files:
+        base_name = os.path.basename(area_file)[:-len("_area.csv")]
+        output_file = os.path.join(args.output, f"{base_name}_material_estimation.csv")
+        merge.estimate_materials(area_file, output_file, rates)
+
+
+def cmd_report(args):
+    merge.generate_report(args.output)
+
+
+def cmd_watch(args):
+    """Process drawings as they are added to or changed in a folder, until interrupted."""
+    import service
+    import watch_folder
+    service.warm_up(args.rates, yolo=not args.no_yolo)
+    service.start_workers(args.workers or service.DEFAULT_WORKERS)
+    watcher = watch_folder.FolderWatcher(args.inputs[0] if args.inputs else DATA_FOLDER,
+                                         os.path.join(args.output, "watch"))
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("🛑 Watch stopped.")
+
+
+# ✅ FUNCTION: Build the Command Line
+def build_parser():
+    parser = argparse.ArgumentParser(description="Material estimation from architectural PDFs and DXFs.")
+    parser.add_argument("--output", default=merge.OUTPUT_FOLDER, help="Folder for extracted data")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, handler, help_text in (
+        ("extract-text", cmd_extract_text, "PDF text layer and schedules"),
+        ("extract-cad", cmd_extract_cad, "DXF/PDF geometry: rooms, areas, symbols, walls"),
+        ("ocr", cmd_ocr, "OCR scanned or image-only sheets"),
+        ("detect", cmd_detect, "YOLO object detection on images and PDF sheets"),
+        ("estimate", cmd_estimate, "Material quantities from area CSVs"),
+        ("report", cmd_report, "Combine outputs into the final project report"),
+        ("watch", cmd_watch, "Process new or changed drawings in a folder as they arrive"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("inputs", nargs="*", help="Files or folders (default: data/ or the output folder)")
+        command.set_defaults(handler=handler)
+        if name in ("extract-cad", "estimate", "watch"):
+            command.add_argument("--rates", help="CSV with Material,Rate columns overriding MATERIAL_RATES")
+        if name == "ocr":
+            command.add_argument("--mode", choices=("regions", "page"), default=merge.OCR_MODE)
+        if name == "detect":
+            command.add_argument("--model", help=f"YOLO weights (default: {merge.YOLO_MODEL_PATH})")
+        if name == "watch":
+            command.add_argument("--workers", type=int, help="Files processed concurrently (default: service.DEFAULT_WORKERS)")
+            command.add_argument("--no-yolo", action="store_true", help="Skip preloading the YOLO model")
+    return parser
+
+
+# ✅ MAIN EXECUTION
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    os.makedirs(args.output, exist_ok=True)
+
+    startup = time.perf_counter() - _STARTED
+    if startup > STARTUP_BUDGET_S:
+        print(f"⚠️ Startup took {startup:.2f}s (budget {STARTUP_BUDGET_S:.2f}s); check for heavy module-level imports.")
+
+    args.handler(args)
+    print(f"⏱️ {args.command} finished in {time.perf_counter() - _STARTED:.2f}s (startup {startup:.2f}s)")
@@ -1,19 +1,24 @@
 import os
 import subprocess
-import ezdxf
+import threading
 import pandas as pd
-import fitz  # PyMuPDF for vector extraction
-import cv2
-import pytesseract
-from ultralytics import YOLO
+from sheet_classifier import pages_for_stage
+
+# Heavy dependencies (ezdxf, PyMuPDF, pdfplumber, OpenCV, tesseract, YOLO) are
+# imported inside the functions that need them, so importing this module is cheap.
 
 # 🛠️ CONFIGURATION
 INKSCAPE_PATH = r"C:\Program Files\Inkscape\bin\inkscape.exe"
-TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
+TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"  # Used only if it exists
+RESOLVE_DXF_BLOCKS = False  # Explode INSERTs (forces full DXF load when blocks exist)
+OUTPUT_FOLDER = "extracted_data"
+YOLO_MODEL_PATH = "yolov8.pt"
+AI_ROOM_DPI = 150  # Render DPI of unlabelled DXFs for AI room detection
+OCR_MODE = "regions"  # "regions": OCR detected text blocks only, "page": OCR full sheets
 
-# 📌 DXF UNIT MAPPING
-DXF_UNIT_TO_FEET = {1: 1, 2: 0.0833, 3: 0.00328, 4: 0.03937, 5: 1.09361}
+# 📌 DXF UNIT MAPPING ($INSUNITS code → feet per drawing unit; unitless drawings are read as feet)
+DXF_UNIT_TO_FEET = {1: 1 / 12, 2: 1, 3: 5280, 4: 1 / 304.8, 5: 1 / 30.48, 6: 3.28084, 7: 3280.84,
+                    10: 3, 14: 0.328084}
 
 # 📌 MATERIAL RATES (Per 100 sq ft)
 MATERIAL_RATES = {
@@ -29,12 +34,59 @@ MATERIAL_RATES = {
     "Plaster (kg)": 10
 }
 
+# 📌 WALL MATERIALS (rates above applied per 100 sq ft of wall: length × height)
+WALL_HEIGHT_FT = 9.0
+WALL_MATERIALS = ("Cement (bags)", "Paint (gallons)", "Bricks (units)", "Sand (cubic meters)", "Plaster (kg)")
+
+# 📌 LOADED YOLO MODELS (kept warm between calls)
+_yolo_models = {}
+_yolo_lock = threading.Lock()
+
+# 📌 PyMuPDF is not thread-safe: service workers hold this lock around PyMuPDF calls
+PDF_LOCK = threading.Lock()
+
+# ✅ FUNCTION: Load Material Rates
+def load_material_rates(rates_file=None):
+    """Return MATERIAL_RATES, overridden by a Material,Rate CSV if given."""
+    rates = dict(MATERIAL_RATES)
+    if rates_file:
+        df = pd.read_csv(rates_file)
+        rates.update(zip(df["Material"], df["Rate"].astype(float)))
+        print(f"📌 Loaded {len(df)} material rates from {rates_file}")
+    return rates
+
+# ✅ FUNCTION: Load YOLO Model (cached)
+def load_yolo_model(model_path=YOLO_MODEL_PATH):
+    with _yolo_lock:
+        if model_path not in _yolo_models:
+            from ultralytics import YOLO  # Pulls in torch; only paid when detection runs
+            _yolo_models[model_path] = YOLO(model_path)
+        return _yolo_models[model_path]
+
+# ✅ FUNCTION: Run the Shared YOLO Model
+def predict_yolo(image, model_path=YOLO_MODEL_PATH, **options):
+    """Run the cached model on an image; calls are serialized because all workers share one model."""
+    model = load_yolo_model(model_path)
+    with _yolo_lock:
+        return model(image, **options)
+
+# ✅ FUNCTION: Configure Tesseract (instead of at import time)
+def configure_tesseract(tesseract_path=TESSERACT_PATH):
+    import pytesseract
+    if tesseract_path and os.path.exists(tesseract_path):
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+
+# ✅ FUNCTION: Get the Shared OCR Pool
+def get_ocr_pool():
+    configure_tesseract()
+    from ocr_pool import get_ocr_pool as shared_ocr_pool
+    return shared_ocr_pool()
+
 # ✅ FUNCTION: Convert PDF to DXF using Inkscape
 def convert_pdf_to_dxf(pdf_path, dxf_path):
     try:
         print(f"🔄 Converting {pdf_path} to DXF...")
-        command = f'"{INKSCAPE_PATH}" "{pdf_path}" --export-filename="{dxf_path}"'
-        subprocess.run(command, shell=True, check=True)
+        subprocess.run([INKSCAPE_PATH, pdf_path, f"--export-filename={dxf_path}"], check=True)
         print(f"✅ Conversion complete: {dxf_path}")
         return True
     except Exception as e:
@@ -42,54 +94,83 @@ def convert_pdf_to_dxf(pdf_path, dxf_path):
         return False
 
 # ✅ FUNCTION: Detect DXF Units
-def detect_dxf_units(doc):
-    dxf_units = doc.header.get("$INSUNITS", 1)
-    scale_factor = DXF_UNIT_TO_FEET.get(dxf_units, 1)
+def detect_dxf_units(dxf_path):
+    from dxf_stream import read_dxf_units
+    dxf_units = read_dxf_units(dxf_path)
+    scale_factor = DXF_UNIT_TO_FEET.get(dxf_units, 1.0)
     print(f"📏 DXF Units Detected: {dxf_units} → Scaling Factor: {scale_factor}")
     return scale_factor
 
 # ✅ FUNCTION: Extract Room Names
-def extract_rooms_from_dxf(dxf_path):
-    doc = ezdxf.readfile(dxf_path)
-    msp = doc.modelspace()
+def extract_rooms_from_dxf(dxf_path, resolve_blocks=RESOLVE_DXF_BLOCKS, output_folder=OUTPUT_FOLDER):
+    from dxf_stream import iter_modelspace, ROOM_ENTITY_TYPES
     rooms = []
 
     print(f"🔍 Extracting Room Data from DXF: {dxf_path}")
 
-    for entity in msp.query("TEXT MTEXT"):
+    for entity in iter_modelspace(dxf_path, ROOM_ENTITY_TYPES, resolve_blocks):
         room_name = entity.dxf.text.strip() if entity.dxftype() == "TEXT" else entity.plain_text().strip()
         x, y = entity.dxf.insert.x, entity.dxf.insert.y
         rooms.append({"Room": room_name, "X": x, "Y": y})
 
     if not rooms:
         print("⚠️ No room labels detected. Using AI-based detection.")
-        detect_rooms_ai(dxf_path)
+        detect_rooms_ai(dxf_path, output_folder)  # Saved for review only; labels stay empty
 
-    df = pd.DataFrame(rooms)
-    df.to_csv("extracted_data/room_data.csv", index=False)
-    print(f"✅ Room data saved: extracted_data/room_data.csv")
+    df = pd.DataFrame(rooms, columns=["Room", "X", "Y"])
+    output_file = os.path.join(output_folder, "room_data.csv")
+    df.to_csv(output_file, index=False)
+    print(f"✅ Room data saved: {output_file}")
+    return df
 
 # ✅ FUNCTION: AI-Based Room Detection (YOLO)
-def detect_rooms_ai(image_path):
-    model = YOLO("yolov8.pt")
-    results = model(image_path)
+def detect_rooms_ai(dxf_path, output_folder=OUTPUT_FOLDER, dpi=AI_ROOM_DPI):
+    """Render the DXF modelspace and run YOLO on it; box centers are returned in drawing units.
 
+    Any failure (no model, nothing drawable) is reported and gives an empty result,
+    so an unlabelled drawing never fails the rest of the extraction.
+    """
     detected_rooms = []
-    for box in results.xyxy[0]:  
-        x1, y1, x2, y2, conf, cls = box
-        detected_rooms.append({"Room": f"Room_{cls}", "X": (x1+x2)/2, "Y": (y1+y2)/2})
+    try:
+        import cv2
+        import ezdxf
+        import numpy as np
+        from ezdxf import bbox
+        from ezdxf.addons.drawing import Frontend, RenderContext, layout, pymupdf
+        from object_detection import run_detection
+
+        doc = ezdxf.readfile(dxf_path)
+        extents = bbox.extents(doc.modelspace())
+        if not extents.has_data:
+            raise ValueError("nothing to render")
+        with PDF_LOCK:
+            backend = pymupdf.PyMuPdfBackend()
+            Frontend(RenderContext(doc), backend).draw_layout(doc.modelspace())
+            page = layout.Page(0, 0, layout.Units.mm, margins=layout.Margins.all(0))
+            png = backend.get_pixmap_bytes(page, fmt="png", dpi=dpi)
+        image = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+        # The page is fitted to the drawing extents, so pixels map linearly back to drawing units
+        height, width = image.shape[:2]
+        sx, sy = extents.size.x / width, extents.size.y / height
+        for label, confidence, x1, y1, x2, y2 in run_detection(image):
+            detected_rooms.append({"Room": f"Room_{label}", "Confidence": confidence,
+                                   "X": extents.extmin.x + (x1 + x2) / 2 * sx,
+                                   "Y": extents.extmax.y - (y1 + y2) / 2 * sy})
+    except Exception as e:
+        print(f"⚠️ AI-based room detection skipped: {e}")
 
-    df = pd.DataFrame(detected_rooms)
-    df.to_csv("extracted_data/detected_rooms.csv", index=False)
-    print("✅ AI-Based Room Detection Completed.")
+    df = pd.DataFrame(detected_rooms, columns=["Room", "Confidence", "X", "Y"])
+    df.to_csv(os.path.join(output_folder, "detected_rooms.csv"), index=False)
+    print(f"✅ AI-Based Room Detection Completed: {len(df)} candidates.")
+    return df
 
 # ✅ FUNCTION: Extract Material Data from DXF Layers
-def extract_materials_from_dxf(dxf_path):
-    doc = ezdxf.readfile(dxf_path)
-    msp = doc.modelspace()
+def extract_materials_from_dxf(dxf_path, resolve_blocks=RESOLVE_DXF_BLOCKS, output_folder=OUTPUT_FOLDER):
+    from dxf_stream import iter_modelspace, MATERIAL_ENTITY_TYPES
     materials = []
 
-    for entity in msp:
+    for entity in iter_modelspace(dxf_path, MATERIAL_ENTITY_TYPES, resolve_blocks):
         material_type = "Unknown"
         layer_name = entity.dxf.layer
 
@@ -107,16 +188,120 @@ def extract_materials_from_dxf(dxf_path):
             materials.append({"Layer": layer_name, "Material Type": material_type})
 
     df = pd.DataFrame(materials)
-    df.to_csv("extracted_data/material_data.csv", index=False)
+    df.to_csv(os.path.join(output_folder, "material_data.csv"), index=False)
     print("✅ Extracted Material Data Saved.")
+    return df
+
+# ✅ FUNCTION: Extract Areas from DXF (Polylines, Hatches, Circles, Ellipses)
+def extract_areas_from_dxf(dxf_path, resolve_blocks=RESOLVE_DXF_BLOCKS, output_folder=OUTPUT_FOLDER,
+                           scale_factor=None):
+    from dxf_stream import iter_modelspace, AREA_ENTITY_TYPES
+    from dxf_geometry import compute_entity_areas, summarize_areas_by_layer
+    if scale_factor is None:
+        scale_factor = detect_dxf_units(dxf_path)
+    entities = iter_modelspace(dxf_path, AREA_ENTITY_TYPES, resolve_blocks)
+    df = compute_entity_areas(entities, scale_factor)
+
+    base_name = os.path.basename(dxf_path).replace(".dxf", "")
+    area_file = os.path.join(output_folder, f"{base_name}_cad_area.csv")
+    layer_file = os.path.join(output_folder, f"{base_name}_layer_area.csv")
+    df.to_csv(area_file, index=False)
+    summarize_areas_by_layer(df).to_csv(layer_file, index=False)
+    print(f"✅ Extracted {len(df)} closed boundaries ({df['Area (sq ft)'].sum():.2f} sq ft): {area_file}")
+    return df
+
+# ✅ FUNCTION: Count Block Symbols in DXF (connectors, hardware)
+def count_symbols_in_dxf(dxf_path, room_df=None, area_df=None, output_folder=OUTPUT_FOLDER, scale_factor=None):
+    from symbol_counter import count_dxf_symbols
+    if scale_factor is None:
+        scale_factor = detect_dxf_units(dxf_path)
+    instances, counts = count_dxf_symbols(dxf_path, room_df, area_df, scale_factor)
+    base_name = os.path.basename(dxf_path).replace(".dxf", "_cad")
+    return save_symbol_counts(instances, counts, base_name, output_folder)
+
+# ✅ FUNCTION: Save Symbol Counts
+def save_symbol_counts(instances, counts, base_name, output_folder=OUTPUT_FOLDER):
+    from symbol_counter import symbol_rows
+    instances.to_csv(os.path.join(output_folder, f"{base_name}_symbol_instances.csv"), index=False)
+    counts.to_csv(os.path.join(output_folder, f"{base_name}_symbol_counts.csv"), index=False)
+    rows_file = os.path.join(output_folder, f"{base_name}_symbol_rows.csv")
+    symbol_rows(counts).to_csv(rows_file, index=False)
+    print(f"✅ Symbol counts saved: {rows_file}")
+    return counts
+
+# ✅ FUNCTION: Linear Takeoff from DXF (wall lengths by layer and room)
+def extract_linear_takeoff_from_dxf(dxf_path, room_df=None, area_df=None, resolve_blocks=RESOLVE_DXF_BLOCKS,
+                                    output_folder=OUTPUT_FOLDER, scale_factor=None):
+    from dxf_stream import iter_modelspace, LINEAR_ENTITY_TYPES
+    from linear_takeoff import linear_takeoff, segments_from_entities
+    if scale_factor is None:
+        scale_factor = detect_dxf_units(dxf_path)
+    segments, layers = segments_from_entities(iter_modelspace(dxf_path, LINEAR_ENTITY_TYPES, resolve_blocks))
+    labels = room_df.rename(columns={"Room": "Text"}).assign(Size=1.0) if room_df is not None else None
+    takeoff = linear_takeoff(segments, layers, scale_factor, labels, area_df)
+    base_name = os.path.basename(dxf_path).replace(".dxf", "_cad")
+    return save_linear_takeoff(*takeoff, base_name, output_folder)
+
+# ✅ FUNCTION: Save Linear Takeoff
+def save_linear_takeoff(runs, walls, layer_summary, room_summary, base_name, output_folder=OUTPUT_FOLDER):
+    runs.to_csv(os.path.join(output_folder, f"{base_name}_line_runs.csv"), index=False)
+    walls.to_csv(os.path.join(output_folder, f"{base_name}_walls.csv"), index=False)
+    layer_summary.to_csv(os.path.join(output_folder, f"{base_name}_layer_length.csv"), index=False)
+    room_file = os.path.join(output_folder, f"{base_name}_room_length.csv")
+    room_summary.to_csv(room_file, index=False)
+    print(f"✅ Linear takeoff saved: {room_file}")
+    return room_summary
+
+# ✅ FUNCTION: Wall Material Estimation (length × height)
+def estimate_wall_materials(room_summary, rates=MATERIAL_RATES, wall_height=WALL_HEIGHT_FT):
+    """Apply wall-surface material rates to wall area (double-line wall length × height) per room and layer."""
+    df = room_summary[room_summary["Wall Length (ft)"] > 0].reset_index(drop=True)
+    df = df[[c for c in ("Page", "Room Name", "Layer", "Wall Length (ft)") if c in df.columns]]
+    df["Wall Area (sq ft)"] = df["Wall Length (ft)"] * wall_height
+
+    for material in WALL_MATERIALS:
+        if material in rates:
+            df[material] = (df["Wall Area (sq ft)"] / 100) * rates[material]
+
+    print(f"🧱 Wall materials estimated for {df['Wall Length (ft)'].sum():.1f} ft of wall")
+    return df
+
+# ✅ FUNCTION: Room-wise Material Estimation
+def estimate_room_materials(room_df, area_df, rates=MATERIAL_RATES):
+    """Match each room label to its smallest enclosing boundary and apply material rates (one row per boundary)."""
+    from dxf_geometry import locate_points
+    from symbol_counter import is_room_label
+    labels = room_df[room_df["Room"].astype(str).map(is_room_label)]
+    index = locate_points(labels["X"], labels["Y"], area_df)
+    matched = pd.DataFrame({"Room": labels["Room"].to_numpy(), "Boundary": index})
+    matched = matched[matched["Boundary"] >= 0].drop_duplicates("Boundary").reset_index(drop=True)
+    df = matched[["Room"]].copy()
+    df["Layer"] = area_df["Layer"].to_numpy()[matched["Boundary"]]
+    df["Area (sq ft)"] = area_df["Area (sq ft)"].to_numpy()[matched["Boundary"]]
+
+    for material, rate in rates.items():
+        df[material] = (df["Area (sq ft)"] / 100) * rate
+
+    print(f"📏 Matched {len(df)} of {len(room_df)} room labels to boundaries")
+    return df
+
+# ✅ FUNCTION: Room-wise Material Estimation from PDF Room Areas
+def estimate_pdf_room_materials(room_area_df, rates=MATERIAL_RATES):
+    """Apply material rates to the named room areas of extract_measurements_from_pdf (no DXF needed)."""
+    df = room_area_df[["Page", "Room Name", "Layer", "Area (sq ft)"]].rename(columns={"Room Name": "Room"})
+    df = df.reset_index(drop=True)
+
+    for material, rate in rates.items():
+        df[material] = (df["Area (sq ft)"] / 100) * rate
+
+    print(f"📏 Estimated materials for {len(df)} PDF room areas")
+    return df
 
 # ✅ FUNCTION: Estimate Material Consumption
-def estimate_materials():
-    input_file = "extracted_data/sample_cad_area.csv"
-    output_file = "extracted_data/material_estimation.csv"
-
+def estimate_materials(input_file, output_file, rates=MATERIAL_RATES):
+    """Material totals for the summed area of one <name>_cad_area.csv or <name>_pdf_area.csv."""
     if not os.path.exists(input_file):
-        print("❌ CAD area file not found. Run `extract_cad.py` first.")
+        print("❌ CAD area file not found. Run `python main.py extract-cad` first.")
         return
 
     df = pd.read_csv(input_file)
@@ -125,51 +310,245 @@ def estimate_materials():
     print(f"📏 Total extracted area: {total_area:.2f} sq ft")
 
     materials = {"Total Area (sq ft)": total_area}
-    for material, rate in MATERIAL_RATES.items():
+    for material, rate in rates.items():
         materials[material] = (total_area / 100) * rate
 
     pd.DataFrame([materials]).to_csv(output_file, index=False)
     print(f"✅ Material estimation saved: {output_file}")
 
+# 📌 REPORT SECTIONS (sheet name → file suffix of per-drawing outputs)
+REPORT_PARTS = {
+    "Rooms": "_room_material_estimation.csv",
+    "CAD Walls": "_cad_wall_material_estimation.csv",
+    "PDF Walls": "_pdf_wall_material_estimation.csv",
+    "CAD Symbols": "_cad_symbol_rows.csv",
+    "PDF Symbols": "_pdf_symbol_rows.csv",
+    "Schedules": "_schedule_rows.csv",
+    "Layers": "_layer_area.csv",
+}
+
+# ✅ FUNCTION: Generate Final Project Report
+def generate_report(output_folder=OUTPUT_FOLDER):
+    """Combine per-drawing outputs into material totals (CSV) and a multi-sheet Excel report."""
+    parts = {}
+    for name, suffix in REPORT_PARTS.items():
+        files = sorted(f for f in os.listdir(output_folder) if f.endswith(suffix))
+        if files:
+            parts[name] = pd.concat(
+                [pd.read_csv(os.path.join(output_folder, f)).assign(Source=f[:-len(suffix)]) for f in files],
+                ignore_index=True)
+    if not parts:
+        print(f"❌ No extracted data found in {output_folder}. Run the extraction commands first.")
+        return None
+
+    # A PDF and the DXF converted from it measure the same walls: the CAD takeoff wins
+    walls = [parts[name] for name in ("CAD Walls", "PDF Walls") if name in parts]
+    if len(walls) == 2:
+        walls[1] = walls[1][~walls[1]["Source"].isin(walls[0]["Source"])]
+    estimates = walls
+    if "Rooms" in parts:
+        # Drawings with a wall takeoff take wall materials from wall area, not floor area
+        rooms = parts["Rooms"].copy()
+        walled = pd.concat(walls)["Source"] if walls else []
+        rooms.loc[rooms["Source"].isin(walled), [m for m in WALL_MATERIALS if m in rooms.columns]] = 0.0
+        estimates = [rooms] + walls
+        parts["Rooms"] = rooms
+    totals = pd.concat(estimates, ignore_index=True) if estimates else pd.DataFrame(columns=["Source"])
+    material_columns = [c for c in MATERIAL_RATES if c in totals.columns]
+    totals = totals.groupby("Source")[material_columns].sum().reset_index()
+
+    report_csv = os.path.join(output_folder, "final_project_report.csv")
+    totals.to_csv(report_csv, index=False)
+    print(f"✅ Final report saved: {report_csv}")
+
+    report_excel = os.path.join(output_folder, "final_project_report.xlsx")
+    try:
+        with pd.ExcelWriter(report_excel) as writer:
+            totals.to_excel(writer, sheet_name="Totals", index=False)
+            for name, df in parts.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+        print(f"✅ Final report saved: {report_excel}")
+    except ImportError:
+        print("⚠️ openpyxl is not installed; Excel report skipped.")
+    return totals
+
 # ✅ FUNCTION: Extract Vector Data from PDF (Using PyMuPDF)
-def extract_vector_from_pdf(pdf_path):
+def extract_vector_from_pdf(pdf_path, output_folder=OUTPUT_FOLDER):
+    import fitz  # PyMuPDF for vector extraction
     doc = fitz.open(pdf_path)
     extracted_text = []
 
     for page in doc:
         extracted_text.append(page.get_text("text"))
 
-    with open("extracted_data/vector_data.txt", "w") as f:
+    with open(os.path.join(output_folder, "vector_data.txt"), "w") as f:
         f.write("\n".join(extracted_text))
 
     print("✅ Vector Data Extracted from PDF.")
 
-# ✅ FUNCTION: Extract OCR Data from PDF
-def extract_ocr_from_pdf(pdf_path):
-    images = convert_from_path(pdf_path)
-    text_data = []
-
-    for img in images:
-        text = pytesseract.image_to_string(img)
-        text_data.append(text)
+# ✅ FUNCTION: Classify Sheets (routes pages to the stages they need)
+def classify_pdf_sheets(pdf_path, output_folder=OUTPUT_FOLDER):
+    import fitz
+    from sheet_classifier import classify_sheets
+    with fitz.open(pdf_path) as doc:
+        sheets = classify_sheets(doc)
+
+    base_name = os.path.basename(pdf_path).replace(".pdf", "")
+    sheets.to_csv(os.path.join(output_folder, f"{base_name}_sheets.csv"), index=False)
+    return sheets
+
+# ✅ FUNCTION: Measure PDF Directly (Scale, Dimensions, Areas)
+def extract_measurements_from_pdf(pdf_path, output_folder=OUTPUT_FOLDER, pages=None):
+    import fitz
+    from pdf_measure import measure_pdf
+    from symbol_counter import room_areas
+    with fitz.open(pdf_path) as doc:
+        scale_df, dimension_df, path_df = measure_pdf(doc, pages)
+        area_df = room_areas(doc, path_df)  # Only labelled rooms are summed as floor area
+
+    base_name = os.path.basename(pdf_path).replace(".pdf", "")
+    scale_df.to_csv(os.path.join(output_folder, f"{base_name}_pdf_scale.csv"), index=False)
+    dimension_df.to_csv(os.path.join(output_folder, f"{base_name}_pdf_dimensions.csv"), index=False)
+    area_file = os.path.join(output_folder, f"{base_name}_pdf_area.csv")
+    area_df.to_csv(area_file, index=False)
+    print(f"✅ PDF measurements saved: {area_file}")
+    return area_df
+
+# ✅ FUNCTION: Count Repeated Vector Symbols in PDF (replaces LLM item counting)
+def count_symbols_in_pdf(pdf_path, output_folder=OUTPUT_FOLDER, pages=None):
+    import fitz
+    from symbol_counter import count_pdf_symbols
+    with fitz.open(pdf_path) as doc:
+        instances, counts = count_pdf_symbols(doc, pages)
+    base_name = os.path.basename(pdf_path).replace(".pdf", "_pdf")
+    return save_symbol_counts(instances, counts, base_name, output_folder)
+
+# ✅ FUNCTION: Linear Takeoff from PDF (calibrated pages only)
+def extract_linear_takeoff_from_pdf(pdf_path, output_folder=OUTPUT_FOLDER, pages=None):
+    import fitz
+    from linear_takeoff import linear_takeoff, page_segments
+    from pdf_measure import calibrate_page, read_page_geometry
+    from symbol_counter import page_labels, room_boundaries
+    results = []
+    with fitz.open(pdf_path) as doc:
+        for page_number, page in enumerate(doc, start=1):
+            if pages is not None and page_number not in pages:
+                continue
+            drawings = page.get_drawings()
+            segments, layers = page_segments(page, drawings)
+            scale_info, _ = calibrate_page(page, segments)
+            if not scale_info["Feet per Point"]:
+                print(f"⚠️ Page {page_number}: no drawing scale, skipping linear takeoff")
+                continue
+            _, rings = read_page_geometry(page, drawings)
+            takeoff = linear_takeoff(segments, layers, scale_info["Feet per Point"], page_labels(page),
+                                     room_boundaries(rings, page), area_column="Area (sq ft)")
+            for df in takeoff:
+                df.insert(0, "Page", page_number)
+            results.append(takeoff)
+
+    if not results:
+        return pd.DataFrame(columns=["Page", "Room Name", "Layer", "Line Length (ft)", "Wall Length (ft)"])
+    combined = [pd.concat(parts, ignore_index=True) for parts in zip(*results)]
+    base_name = os.path.basename(pdf_path).replace(".pdf", "_pdf")
+    return save_linear_takeoff(*combined, base_name, output_folder)
+
+# ✅ FUNCTION: Parse Schedules and Legends (fast path before the LLM)
+def extract_schedules_from_pdf(pdf_path, output_folder=OUTPUT_FOLDER, pages=None):
+    import fitz
+    import pdfplumber
+    from schedule_parser import page_tables, parse_schedules, strip_parsed_text
+    with pdfplumber.open(pdf_path) as pdf:
+        found = [
+            table
+            for page_number, page in enumerate(pdf.pages, start=1)
+            if pages is None or page_number in pages
+            for table in page_tables(page)
+        ]
+    tables = [rows for rows, _ in found]
+    with fitz.open(pdf_path) as doc:
+        text = "\n".join(page.get_text("text") for page in doc)
+
+    rows, parsed_tables, unparsed_tables = parse_schedules(tables, [title for _, title in found])
+    llm_text = [strip_parsed_text(text, parsed_tables)]
+    for table in unparsed_tables:
+        llm_text.append(pd.DataFrame(table).dropna(how="all").to_csv(index=False, header=False))
+
+    base_name = os.path.basename(pdf_path).replace(".pdf", "")
+    rows_file = os.path.join(output_folder, f"{base_name}_schedule_rows.csv")
+    rows.to_csv(rows_file, index=False)
+    with open(os.path.join(output_folder, f"{base_name}_llm_text.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(llm_text))
+    print(f"✅ Schedule rows saved: {rows_file}")
+    return rows
+
+def _page_runs(pages):
+    """Sorted page numbers as (first, last) runs of consecutive pages: {1, 2, 3, 7} -> [(1, 3), (7, 7)]."""
+    runs = []
+    for page_number in sorted(pages):
+        if runs and page_number == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page_number)
+        else:
+            runs.append((page_number, page_number))
+    return runs
+
+def _iter_locked(items, lock=PDF_LOCK):
+    """Yield from `items`, holding `lock` only while the next item is produced (e.g. rendered)."""
+    items = iter(items)
+    while True:
+        with lock:
+            item = next(items, None)
+        if item is None:
+            return
+        yield item
 
-    with open("extracted_data/ocr_data.txt", "w") as f:
+# ✅ FUNCTION: Extract OCR Data from PDF
+def extract_ocr_from_pdf(pdf_path, output_folder=OUTPUT_FOLDER, mode=OCR_MODE, pages=None):
+    configure_tesseract()
+    base_name = os.path.basename(pdf_path).replace(".pdf", "")
+    if mode == "regions":
+        from adaptive_render import render_pdf_adaptive
+        from ocr_regions import ocr_rendered_regions, words_to_text
+
+        # Low-DPI preview first, then only text areas at the DPI their font size needs;
+        # PyMuPDF is locked while a region renders, not while tesseract reads it
+        words = ocr_rendered_regions(_iter_locked(render_pdf_adaptive(pdf_path, purpose="ocr", pages=pages)))
+        words.to_csv(os.path.join(output_folder, f"{base_name}_ocr_words.csv"), index=False)
+        text_data = words_to_text(words)
+    else:
+        from pdf2image import convert_from_path
+        if pages is None:
+            images = convert_from_path(pdf_path)
+        else:
+            # Render only the selected pages, one poppler call per run of consecutive pages
+            images = []
+            for first, last in _page_runs(pages):
+                images.extend(convert_from_path(pdf_path, first_page=first, last_page=last))
+        text_data = get_ocr_pool().recognize_text(images)
+
+    ocr_file = os.path.join(output_folder, f"{base_name}_ocr_data.txt")
+    with open(ocr_file, "w") as f:
         f.write("\n".join(text_data))
 
-    print("✅ OCR Data Extracted from PDF.")
+    print(f"✅ OCR Data Extracted from PDF: {ocr_file}")
 
 # ✅ MAIN EXECUTION
 if __name__ == "__main__":
     data_folder = "data"
-    dxf_folder = "extracted_data"
+    dxf_folder = OUTPUT_FOLDER
 
     os.makedirs(dxf_folder, exist_ok=True)
 
     dxf_files = [f for f in os.listdir(dxf_folder) if f.endswith(".dxf")]
     pdf_files = [f for f in os.listdir(data_folder) if f.endswith(".pdf")]
 
+    sheets = {f: classify_pdf_sheets(os.path.join(data_folder, f)) for f in pdf_files}
+
     if not dxf_files and pdf_files:
         for pdf_file in pdf_files:
+            if not pages_for_stage(sheets[pdf_file], "rooms"):
+                print(f"⏭️ {pdf_file}: no plan sheets, skipping DXF conversion and room assembly")
+                continue
             pdf_path = os.path.join(data_folder, pdf_file)
             dxf_path = os.path.join(dxf_folder, pdf_file.replace(".pdf", ".dxf"))
             convert_pdf_to_dxf(pdf_path, dxf_path)
@@ -177,13 +556,35 @@ if __name__ == "__main__":
 
     for dxf_file in dxf_files:
         dxf_path = os.path.abspath(os.path.join(dxf_folder, dxf_file))
-        extract_rooms_from_dxf(dxf_path)
+        scale_factor = detect_dxf_units(dxf_path)
+        room_df = extract_rooms_from_dxf(dxf_path)
         extract_materials_from_dxf(dxf_path)
+        area_df = extract_areas_from_dxf(dxf_path, scale_factor=scale_factor)
+        count_symbols_in_dxf(dxf_path, room_df, area_df, scale_factor=scale_factor)
+        room_lengths = extract_linear_takeoff_from_dxf(dxf_path, room_df, area_df, scale_factor=scale_factor)
+        wall_file = os.path.join(dxf_folder, os.path.basename(dxf_path).replace(".dxf", "_cad_wall_material_estimation.csv"))
+        estimate_wall_materials(room_lengths).to_csv(wall_file, index=False)
+
+        room_file = os.path.join(dxf_folder, os.path.basename(dxf_path).replace(".dxf", "_room_material_estimation.csv"))
+        estimate_room_materials(room_df, area_df).to_csv(room_file, index=False)
+        print(f"✅ Room-wise material estimation saved: {room_file}")
+
+        base_name = os.path.basename(dxf_path).replace(".dxf", "")
+        estimate_materials(os.path.join(dxf_folder, f"{base_name}_cad_area.csv"),
+                           os.path.join(dxf_folder, f"{base_name}_cad_material_estimation.csv"))
 
     for pdf_file in pdf_files:
         pdf_path = os.path.join(data_folder, pdf_file)
         extract_vector_from_pdf(pdf_path)
-        extract_ocr_from_pdf(pdf_path)
+        extract_measurements_from_pdf(pdf_path, pages=pages_for_stage(sheets[pdf_file], "measure"))
+        base_name = pdf_file.replace(".pdf", "")
+        estimate_materials(os.path.join(dxf_folder, f"{base_name}_pdf_area.csv"),
+                           os.path.join(dxf_folder, f"{base_name}_pdf_material_estimation.csv"))
+        extract_schedules_from_pdf(pdf_path, pages=pages_for_stage(sheets[pdf_file], "tables"))
+        count_symbols_in_pdf(pdf_path, pages=pages_for_stage(sheets[pdf_file], "symbols"))
+        room_lengths = extract_linear_takeoff_from_pdf(pdf_path, pages=pages_for_stage(sheets[pdf_file], "walls"))
+        wall_file = os.path.join(dxf_folder, pdf_file.replace(".pdf", "_pdf_wall_material_estimation.csv"))
+        estimate_wall_materials(room_lengths).to_csv(wall_file, index=False)
+        extract_ocr_from_pdf(pdf_path, pages=pages_for_stage(sheets[pdf_file], "ocr"))
 
-    estimate_materials()
     print("✅ Full Process Completed.")
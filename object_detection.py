@@ -1,15 +1,32 @@
 import cv2
-import numpy as np
 import os
-from ultralytics import YOLO
+import pandas as pd
+from merge import predict_yolo, YOLO_MODEL_PATH  # YOLO/torch are imported on first use, not here
+
+MODEL_PATH = YOLO_MODEL_PATH
+DETECTION_CONFIDENCE = 0.2  # Lower confidence threshold
+DETECTION_COLUMNS = ["Page", "Label", "Confidence", "X0", "Y0", "X1", "Y1"]
 
 def preprocess_image(image_path):
     """Enhance contrast and apply edge detection for blueprint images."""
     image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)  # Load in grayscale
+    return preprocess_gray(image)
+
+def preprocess_gray(image):
     blurred = cv2.GaussianBlur(image, (5, 5), 0)  # Reduce noise
     edges = cv2.Canny(blurred, 50, 150)  # Edge detection
     return edges
 
+def run_detection(image):
+    """Return (label, confidence, x1, y1, x2, y2) for every box YOLO finds in a BGR image."""
+    results = predict_yolo(image, MODEL_PATH, conf=DETECTION_CONFIDENCE)
+    boxes = []
+    for result in results:
+        for box, cls, conf in zip(result.boxes.xyxy, result.boxes.cls, result.boxes.conf):
+            x1, y1, x2, y2 = map(float, box)
+            boxes.append((result.names[int(cls.item())], conf.item(), x1, y1, x2, y2))
+    return boxes
+
 def detect_objects(image_path, output_path):
     """Detect objects (doors, windows, walls) in a blueprint image."""
     processed_image = preprocess_image(image_path)
@@ -22,20 +39,14 @@ def detect_objects(image_path, output_path):
     # Convert back to 3-channel image for YOLO
     processed_image = cv2.cvtColor(processed_image, cv2.COLOR_GRAY2BGR)
 
-    results = model(processed_image, conf=0.2)  # Lower confidence threshold
-
     # Draw bounding boxes if detections are found
     detected = False
-    for result in results:
-        for box in result.boxes.xyxy:
-            x1, y1, x2, y2 = map(int, box)
-            label = result.names[result.boxes.cls[0].item()]
-            confidence = result.boxes.conf[0].item()
-
-            cv2.rectangle(processed_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(processed_image, f"{label} {confidence:.2f}", (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-            detected = True
+    for label, confidence, *box in run_detection(processed_image):
+        x1, y1, x2, y2 = map(int, box)
+        cv2.rectangle(processed_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(processed_image, f"{label} {confidence:.2f}", (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        detected = True
 
     # Save output image
     cv2.imwrite(output_path, processed_image)
@@ -45,6 +56,28 @@ def detect_objects(image_path, output_path):
     else:
         print("⚠️ No objects detected. Try custom YOLO training.")
 
+def detect_objects_in_pdf(pdf_path, output_folder="extracted_data", pages=None):
+    """Detect objects on PDF sheets, rendering only inked regions at the DPI detection needs.
+
+    Boxes are saved in PDF points so they line up with the vector and text layers.
+    """
+    from adaptive_render import render_pdf_adaptive
+
+    rows = []
+    for page_number, clip, dpi, image in render_pdf_adaptive(pdf_path, purpose="detect", pages=pages):
+        processed_image = cv2.cvtColor(preprocess_gray(image), cv2.COLOR_GRAY2BGR)
+        scale = 72 / dpi
+        for label, confidence, x1, y1, x2, y2 in run_detection(processed_image):
+            rows.append({"Page": page_number, "Label": label, "Confidence": confidence,
+                         "X0": clip.x0 + x1 * scale, "Y0": clip.y0 + y1 * scale,
+                         "X1": clip.x0 + x2 * scale, "Y1": clip.y0 + y2 * scale})
+
+    df = pd.DataFrame(rows, columns=DETECTION_COLUMNS)
+    output_file = os.path.join(output_folder, os.path.basename(pdf_path).replace(".pdf", "_detections.csv"))
+    df.to_csv(output_file, index=False)
+    print(f"✅ {len(df)} objects detected: {output_file}")
+    return df
+
 if __name__ == "__main__":
     input_folder = "data"
     output_folder = "extracted_data"
@@ -0,0 +1,167 @@
+import atexit
+import csv
+import io
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import pytesseract
+
+# 📌 OCR POOL CONFIGURATION
+OCR_LANG = "eng"
+OCR_PSM = 3                  # Fully automatic page segmentation (tesseract default)
+OCR_WORKERS = os.cpu_count() or 2
+OMP_THREAD_LIMIT = "1"       # One OpenMP thread per tesseract: the pool already uses every core
+
+# Tesseract reads this when its OpenMP runtime starts, so set it before tesserocr loads
+os.environ.setdefault("OMP_THREAD_LIMIT", OMP_THREAD_LIMIT)
+_WORKER_ENV = {**os.environ, "OMP_THREAD_LIMIT": OMP_THREAD_LIMIT}
+
+try:
+    import tesserocr  # In-process Tesseract API (optional)
+except ImportError:
+    tesserocr = None
+
+# Word tuple layout returned by the pool
+WORD_FIELDS = ("text", "conf", "left", "top", "width", "height", "line")
+
+
+def _to_gray(image):
+    image = np.asarray(image)
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return np.ascontiguousarray(image, dtype=np.uint8)
+
+
+class TesseractPool:
+    """Long-lived OCR workers that load the language data once.
+
+    Uses one tesserocr API instance per worker when tesserocr is installed.
+    Otherwise each batch of images is sent to a single tesseract process
+    through a list file, so the model loads once per batch, not per image.
+    """
+
+    def __init__(self, workers=OCR_WORKERS, lang=OCR_LANG, psm=OCR_PSM):
+        self.workers = workers
+        self.lang = lang
+        self.psm = psm
+        self.backend = "tesserocr" if tesserocr is not None else "cli-batch"
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        self._apis = queue.LifoQueue()
+        if tesserocr is not None:
+            for _ in range(workers):
+                self._apis.put(tesserocr.PyTessBaseAPI(lang=lang, psm=psm))
+        print(f"🔤 OCR pool ready: {workers} {self.backend} workers ({lang})")
+
+    # ✅ FUNCTION: Recognize Words in Many Images
+    def recognize(self, images, psm=None):
+        """Return a list of word tuples (see WORD_FIELDS) for each NumPy image."""
+        images = [_to_gray(image) for image in images]
+        psm = self.psm if psm is None else psm
+        if not images:
+            return []
+
+        if self.backend == "tesserocr":
+            return list(self._executor.map(lambda image: self._recognize_api(image, psm), images))
+
+        # Split into one list-file batch per worker
+        chunks = [images[i::self.workers] for i in range(min(self.workers, len(images)))]
+        chunk_results = list(self._executor.map(lambda chunk: self._recognize_cli(chunk, psm), chunks))
+        results = [None] * len(images)
+        for offset, words in enumerate(chunk_results):
+            results[offset::self.workers] = words
+        return results
+
+    def recognize_text(self, images, psm=None):
+        """Return the recognized text of each image, one line per text line."""
+        return [words_to_lines(words) for words in self.recognize(images, psm)]
+
+    def _recognize_api(self, image, psm):
+        api = self._apis.get()
+        try:
+            api.SetPageSegMode(psm)
+            height, width = image.shape
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            api.Recognize()
+            words = []
+            line = -1
+            level = tesserocr.RIL.WORD
+            iterator = api.GetIterator()
+            for result in tesserocr.iterate_level(iterator, level):
+                text = (result.GetUTF8Text(level) or "").strip()
+                if result.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line += 1
+                if not text:
+                    continue
+                x1, y1, x2, y2 = result.BoundingBox(level)
+                words.append((text, float(result.Confidence(level)), x1, y1, x2 - x1, y2 - y1, line))
+            return words
+        finally:
+            self._apis.put(api)
+
+    def _recognize_cli(self, images, psm):
+        with tempfile.TemporaryDirectory(prefix="ocr_batch_") as folder:
+            paths = []
+            for index, image in enumerate(images):
+                path = os.path.join(folder, f"{index:05d}.png")
+                cv2.imwrite(path, image)
+                paths.append(path)
+            list_file = os.path.join(folder, "images.txt")
+            with open(list_file, "w") as f:
+                f.write("\n".join(paths) + "\n")
+
+            command = [pytesseract.pytesseract.tesseract_cmd, list_file, "stdout",
+                       "-l", self.lang, "--psm", str(psm), "tsv"]
+            output = subprocess.run(command, capture_output=True, check=True, env=_WORKER_ENV).stdout
+        return _parse_tsv(output.decode("utf-8", errors="replace"), len(images))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while not self._apis.empty():
+            self._apis.get().End()
+
+
+def _parse_tsv(tsv, image_count):
+    """Split tesseract TSV output into word tuples per input image (page_num)."""
+    results = [[] for _ in range(image_count)]
+    line_ids = [{} for _ in range(image_count)]
+    for row in csv.DictReader(io.StringIO(tsv), delimiter="\t", quoting=csv.QUOTE_NONE):
+        if row.get("level") != "5":
+            continue
+        text = (row.get("text") or "").strip()
+        if not text:
+            continue
+        page = int(row["page_num"]) - 1
+        key = (row["block_num"], row["par_num"], row["line_num"])
+        line = line_ids[page].setdefault(key, len(line_ids[page]))
+        results[page].append((text, float(row["conf"]), int(row["left"]), int(row["top"]),
+                              int(row["width"]), int(row["height"]), line))
+    return results
+
+
+# ✅ FUNCTION: Join Words into Lines
+def words_to_lines(words):
+    lines = {}
+    for word in words:
+        lines.setdefault(word[6], []).append(word[0])
+    return "\n".join(" ".join(line) for _, line in sorted(lines.items()))
+
+
+# 📌 SHARED POOL
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# ✅ FUNCTION: Get the Shared OCR Pool
+def get_ocr_pool():
+    """Return the process-wide OCR pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = TesseractPool()
+            atexit.register(_pool.close)
+        return _pool
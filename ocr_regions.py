@@ -0,0 +1,172 @@
+import itertools
+import cv2
+import numpy as np
+import pandas as pd
+from ocr_pool import get_ocr_pool
+
+# 📌 TEXT REGION DETECTION (pixel sizes at ~200-300 DPI)
+LINE_KERNEL_LENGTH = 40      # Strokes longer than this are treated as linework
+MERGE_KERNEL = (15, 3)       # Joins characters into words and words into labels
+TEXT_MIN_HEIGHT = 6
+TEXT_MAX_HEIGHT = 120
+TEXT_MIN_WIDTH = 6
+MIN_INK_DENSITY = 0.04
+MAX_INK_DENSITY = 0.6
+REGION_PADDING = 4
+
+# 📌 BATCHED OCR
+OCR_PSM = 11                 # Sparse text: find as much text as possible in no particular order
+BATCH_MAX_HEIGHT = 2000      # Crops are stacked into strips up to this height
+BATCH_GAP = 20
+
+WORD_COLUMNS = ["Page", "Region", "Text", "Confidence", "X", "Y", "Width", "Height"]
+
+
+# ✅ FUNCTION: Preprocess for Text Detection
+def preprocess_for_text(gray):
+    """Binarize a blueprint and strip long horizontal/vertical strokes."""
+    blurred = cv2.GaussianBlur(gray, (3, 3), 0)  # Reduce noise
+    _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    # Walls, grid and dimension lines survive an opening with a long kernel; text does not
+    horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (LINE_KERNEL_LENGTH, 1)))
+    vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, LINE_KERNEL_LENGTH)))
+    return cv2.subtract(binary, cv2.bitwise_or(horizontal, vertical))
+
+
+# ✅ FUNCTION: Find Candidate Text Blocks
+def find_text_regions(gray):
+    """Return an (N, 4) array of x, y, w, h boxes likely to contain text."""
+    ink = preprocess_for_text(gray)
+    merged = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, MERGE_KERNEL))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(merged, connectivity=8)
+    x, y, w, h = stats[1:, 0], stats[1:, 1], stats[1:, 2], stats[1:, 3]
+
+    # Ink density per box from an integral image (solid fills and hatching are dense)
+    integral = cv2.integral((ink > 0).astype(np.uint8))
+    ink_pixels = integral[y + h, x + w] - integral[y, x + w] - integral[y + h, x] + integral[y, x]
+    density = ink_pixels / np.maximum(w * h, 1)
+
+    keep = ((h >= TEXT_MIN_HEIGHT) & (h <= TEXT_MAX_HEIGHT) & (w >= TEXT_MIN_WIDTH)
+            & (density >= MIN_INK_DENSITY) & (density <= MAX_INK_DENSITY))
+
+    x0 = np.clip(x[keep] - REGION_PADDING, 0, gray.shape[1])
+    y0 = np.clip(y[keep] - REGION_PADDING, 0, gray.shape[0])
+    x1 = np.clip(x[keep] + w[keep] + REGION_PADDING, 0, gray.shape[1])
+    y1 = np.clip(y[keep] + h[keep] + REGION_PADDING, 0, gray.shape[0])
+    return np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)
+
+
+def _make_batches(boxes):
+    """Group boxes (tallest first) into strips no taller than BATCH_MAX_HEIGHT."""
+    order = np.argsort(-boxes[:, 3], kind="stable")
+    batches, current, height = [], [], 0
+    for index in order:
+        box_height = int(boxes[index, 3]) + BATCH_GAP
+        if current and height + box_height > BATCH_MAX_HEIGHT:
+            batches.append(current)
+            current, height = [], 0
+        current.append(index)
+        height += box_height
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _build_strip(gray, boxes, indices):
+    """Stack crops into one white strip; returns the strip and each crop's top offset."""
+    widths = boxes[indices, 2]
+    heights = boxes[indices, 3]
+    offsets = np.cumsum(np.r_[0, heights[:-1] + BATCH_GAP])
+    strip = np.full((int(offsets[-1] + heights[-1]), int(widths.max())), 255, dtype=np.uint8)
+    for index, top in zip(indices, offsets):
+        x, y, w, h = boxes[index]
+        strip[top:top + h, :w] = gray[y:y + h, x:x + w]
+    return strip, offsets
+
+
+def _map_words(strip_words, boxes, indices, offsets, origin, scale, first_region):
+    """Map words recognized in a strip back to page coordinates and their source region."""
+    words = []
+    for text, conf, left, top, width, height, _ in strip_words:
+        # The crop whose band contains the word's vertical center
+        slot = int(np.searchsorted(offsets, top + height / 2, side="right")) - 1
+        region = indices[slot]
+        x, y, _, _ = boxes[region]
+        page_x = origin[0] + (x + left) * scale
+        page_y = origin[1] + (y + top - offsets[slot]) * scale
+        words.append((first_region + int(region), text, float(conf), page_x, page_y, width * scale, height * scale))
+    return words
+
+
+# ✅ FUNCTION: OCR Text Regions of One Page
+def ocr_page_regions(image, page_number=1, origin=(0, 0), scale=1.0, first_region=0):
+    """OCR only the detected text blocks of a page image; returns a words DataFrame.
+
+    Word boxes are image pixels by default; pass the image's `origin` on the page
+    and a pixel-to-page `scale` to get page coordinates instead. Region ids start
+    at `first_region` so several images of one page can be combined.
+    """
+    return ocr_page_images([(image, origin, scale)], page_number, first_region)
+
+
+# ✅ FUNCTION: OCR Several Images of One Page in One Pool Call
+def ocr_page_images(images, page_number=1, first_region=0):
+    """Like ocr_page_regions for a list of (image, origin, scale) crops of one page.
+
+    The strips of all crops go to the OCR pool together, so the page costs one
+    recognize() call (one tesseract process per worker on the CLI backend).
+    """
+    prepared, strips = [], []
+    for image, origin, scale in images:
+        image = np.asarray(image)
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        boxes = find_text_regions(gray)
+        if len(boxes) == 0:
+            continue
+        batches = _make_batches(boxes)
+        built = [_build_strip(gray, boxes, indices) for indices in batches]
+        prepared.append((boxes, batches, built, origin, scale, first_region))
+        strips.extend(strip for strip, _ in built)
+        first_region += len(boxes)
+    if not strips:
+        return pd.DataFrame(columns=WORD_COLUMNS)
+
+    results = iter(get_ocr_pool().recognize(strips, psm=OCR_PSM))
+    words = []
+    for boxes, batches, built, origin, scale, first in prepared:
+        for indices, (_, offsets) in zip(batches, built):
+            words.extend(_map_words(next(results), boxes, indices, offsets, origin, scale, first))
+
+    df = pd.DataFrame(words, columns=WORD_COLUMNS[1:])
+    df.insert(0, "Page", page_number)
+    region_count = sum(len(boxes) for boxes, *_ in prepared)
+    print(f"🔤 Page {page_number}: {region_count} text regions in {len(strips)} OCR batches, {len(df)} words")
+    return df
+
+
+# ✅ FUNCTION: OCR Text Regions of Many Pages
+def ocr_regions_from_images(images):
+    pages = [ocr_page_regions(image, page_number) for page_number, image in enumerate(images, start=1)]
+    return pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=WORD_COLUMNS)
+
+
+# ✅ FUNCTION: OCR Adaptively Rendered Regions
+def ocr_rendered_regions(rendered):
+    """OCR (page_number, clip, dpi, image) regions one page at a time; word boxes are in PDF points."""
+    pages = []
+    for page_number, regions in itertools.groupby(rendered, key=lambda region: region[0]):
+        crops = [(image, (clip.x0, clip.y0), 72 / dpi) for _, clip, dpi, image in regions]
+        pages.append(ocr_page_images(crops, page_number))
+    return pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=WORD_COLUMNS)
+
+
+# ✅ FUNCTION: Rebuild Text from OCR Words
+def words_to_text(words):
+    """Return one text string per page with one line per region, top to bottom."""
+    texts = []
+    for _, page in words.groupby("Page", sort=True):
+        region_order = page.groupby("Region")[["Y", "X"]].min().sort_values(["Y", "X"]).index
+        region_text = page.groupby("Region")["Text"].agg(" ".join)
+        texts.append("\n".join(region_text[region_order]))
+    return texts
@@ -0,0 +1,293 @@
+import re
+import statistics
+import numpy as np
+import pandas as pd
+from dxf_geometry import compute_ring_metrics, compute_ring_bounds
+
+# 📌 DIMENSION AND SCALE PATTERNS
+_NUMBER = r"\d+(?:\s+\d+/\d+)?|\d+/\d+|\d+\.\d+"
+FEET_INCHES = re.compile(rf"(?<![\d.])(\d+(?:\.\d+)?)\s*['’]\s*-?\s*(?:({_NUMBER})\s*[\"”])?")
+INCHES = re.compile(rf"(?<![\d'’/.])({_NUMBER})\s*[\"”]")
+METRIC = re.compile(r"(?<![\d.,])(\d+(?:\.\d+)?)\s*(mm|cm|m)(?![A-Za-z\d²³^])")
+BARE_MILLIMETRES = re.compile(r"\d{3,5}")  # Metric dimension text without a unit (whole text line)
+METRIC_TO_FEET = {"mm": 1 / 304.8, "cm": 1 / 30.48, "m": 3.28084}
+IMPERIAL_SCALE = re.compile(rf"({_NUMBER})\s*[\"”]\s*=\s*(\d+)\s*['’]\s*-?\s*(?:({_NUMBER})\s*[\"”])?")
+METRIC_SCALE = re.compile(r"(?<![\d.])1\s*:\s*(\d+)(?![\d.])")
+
+# 📌 CALIBRATION
+POINTS_PER_INCH = 72
+MATCH_RADIUS_PT = 36          # Max distance from dimension text to its dimension line midpoint
+MIN_SEGMENT_PT = 10           # Ignore tick marks and arrowheads
+PARALLEL_TOLERANCE = 0.1      # |sin| of the angle between text and segment
+MIN_MATCHES = 3               # Dimension matches needed before they override a scale note
+MIN_AREA_SQFT = 1.0
+BEZIER_STEPS = 8              # Chords per Bezier curve (areas of curved rooms)
+
+
+def _to_number(text):
+    """'1 1/2' -> 1.5, '3/4' -> 0.75, '12' -> 12.0"""
+    total = 0.0
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            total += float(numerator) / float(denominator) if float(denominator) else 0.0
+        else:
+            total += float(part)
+    return total
+
+
+# ✅ FUNCTION: Parse Scale Notes
+def parse_scale_note(text):
+    """Return the real/paper ratio of a scale note (1/4" = 1'-0" -> 48, 1:100 -> 100), else None."""
+    match = IMPERIAL_SCALE.search(text)
+    if match:
+        paper_inches = _to_number(match.group(1))
+        real_inches = int(match.group(2)) * 12 + (_to_number(match.group(3)) if match.group(3) else 0.0)
+        if paper_inches > 0 and real_inches > 0:
+            return real_inches / paper_inches
+    match = METRIC_SCALE.search(text)
+    if match and int(match.group(1)) > 1:
+        return float(match.group(1))
+    return None
+
+
+# ✅ FUNCTION: Parse Dimension Strings
+def parse_dimensions(text, metric=False):
+    """Return [(matched_text, feet), ...] for 12'-6", 12.5', 6 1/2" and, if `metric`, 3.6 m or 3600 mm.
+
+    A bare number is read as millimetres only when it is the whole text (as on a
+    dimension line); room numbers and years inside other text are ignored.
+    """
+    dimensions = []
+    remaining = text
+    for match in FEET_INCHES.finditer(text):
+        feet = float(match.group(1)) + (_to_number(match.group(2)) / 12 if match.group(2) else 0.0)
+        dimensions.append((match.group(0).strip(), feet))
+        remaining = remaining[:match.start()] + " " * (match.end() - match.start()) + remaining[match.end():]
+    for match in INCHES.finditer(remaining):
+        dimensions.append((match.group(0).strip(), _to_number(match.group(1)) / 12))
+    if metric and not dimensions:
+        for match in METRIC.finditer(text):
+            dimensions.append((match.group(0), float(match.group(1)) * METRIC_TO_FEET[match.group(2)]))
+        if not dimensions and BARE_MILLIMETRES.fullmatch(text.strip()):
+            dimensions.append((text.strip(), int(text.strip()) / 304.8))
+    return dimensions
+
+
+def _flatten_bezier(p0, p1, p2, p3, steps=BEZIER_STEPS):
+    """Points along a cubic Bezier curve after its start point."""
+    t = np.linspace(0.0, 1.0, steps + 1)[1:, None]
+    points = ((1 - t) ** 3 * (p0.x, p0.y) + 3 * (1 - t) ** 2 * t * (p1.x, p1.y)
+              + 3 * (1 - t) * t ** 2 * (p2.x, p2.y) + t ** 3 * (p3.x, p3.y))
+    points[-1] = (p3.x, p3.y)  # Exact end point so subpaths still close
+    return [tuple(point) for point in points.tolist()]
+
+
+def _text_lines(page):
+    """Yield (text, bbox, direction) for every text line of the page."""
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                yield text, line["bbox"], line["dir"]
+
+
+# ✅ FUNCTION: Read Page Geometry in One Pass
+def read_page_geometry(page, drawings=None):
+    """Return (segments, rings) from page.get_drawings() (or `drawings` if already read).
+
+    segments is an (N, 4) array of x0, y0, x1, y1 in points; rings holds flat
+    x/y arrays with ring ids for every closed path, ready for the area kernel.
+    Bezier curves are flattened into BEZIER_STEPS chords.
+    """
+    segments = []
+    xs, ys, ring_ids, ring_layers = [], [], [], []
+
+    def close_ring(points, layer):
+        if len(points) > 2:
+            ring_index = len(ring_layers)
+            xs.extend(p[0] for p in points)
+            ys.extend(p[1] for p in points)
+            ring_ids.extend([ring_index] * len(points))
+            ring_layers.append(layer)
+
+    if drawings is None:
+        drawings = page.get_drawings()
+    for path in drawings:
+        layer = path.get("layer") or ""
+        chain = []
+        for item in path["items"]:
+            kind = item[0]
+            if kind == "re":
+                rect = item[1]
+                corners = [(rect.x0, rect.y0), (rect.x1, rect.y0), (rect.x1, rect.y1), (rect.x0, rect.y1)]
+                segments.extend((*corners[i], *corners[(i + 1) % 4]) for i in range(4))
+                close_ring(corners, layer)
+                continue
+            if kind == "qu":
+                quad = item[1]
+                corners = [(quad.ul.x, quad.ul.y), (quad.ur.x, quad.ur.y), (quad.lr.x, quad.lr.y), (quad.ll.x, quad.ll.y)]
+                segments.extend((*corners[i], *corners[(i + 1) % 4]) for i in range(4))
+                close_ring(corners, layer)
+                continue
+
+            start, end = item[1], item[-1]  # "l": p1, p2 / "c": p1, c1, c2, p2
+            points = _flatten_bezier(*item[1:5]) if kind == "c" else [(end.x, end.y)]
+            previous = (start.x, start.y)
+            for point in points:
+                segments.append((*previous, *point))
+                previous = point
+            if chain and (abs(chain[-1][0] - start.x) > 1e-6 or abs(chain[-1][1] - start.y) > 1e-6):
+                # A new subpath starts: keep the previous one only if it closed on itself
+                if chain[0] == chain[-1]:
+                    close_ring(chain[:-1], layer)
+                chain = []
+            if not chain:
+                chain.append((start.x, start.y))
+            chain.extend(points)
+
+        if chain:
+            if chain[0] == chain[-1]:
+                close_ring(chain[:-1], layer)
+            elif path.get("closePath"):
+                close_ring(chain, layer)
+
+    rings = {
+        "x": np.asarray(xs, dtype=float),
+        "y": np.asarray(ys, dtype=float),
+        "ring": np.asarray(ring_ids, dtype=np.int64),
+        "layer": ring_layers,
+    }
+    return np.asarray(segments, dtype=float).reshape(-1, 4), rings
+
+
+# ✅ FUNCTION: Spatial Index of Segment Midpoints
+def build_segment_index(segments, cell_size=MATCH_RADIUS_PT):
+    """Bucket segments by the grid cell of their midpoint; returns {(cx, cy): indices}."""
+    mid = (segments[:, :2] + segments[:, 2:]) / 2.0
+    cells = np.floor(mid / cell_size).astype(np.int64)
+    order = np.lexsort((cells[:, 1], cells[:, 0]))
+    sorted_cells = cells[order]
+    starts = np.flatnonzero(np.r_[True, (sorted_cells[1:] != sorted_cells[:-1]).any(axis=1)])
+    ends = np.r_[starts[1:], len(order)]
+    return {tuple(sorted_cells[s]): order[s:e] for s, e in zip(starts, ends)}
+
+
+def _nearest_parallel_segment(segments, index, center, direction, cell_size=MATCH_RADIUS_PT):
+    """Index of the closest segment parallel to the text direction, or None."""
+    cx, cy = int(np.floor(center[0] / cell_size)), int(np.floor(center[1] / cell_size))
+    candidates = [index[key] for key in ((cx + i, cy + j) for i in (-1, 0, 1) for j in (-1, 0, 1)) if key in index]
+    if not candidates:
+        return None
+    candidates = np.concatenate(candidates)
+
+    seg = segments[candidates]
+    dx, dy = seg[:, 2] - seg[:, 0], seg[:, 3] - seg[:, 1]
+    length = np.hypot(dx, dy)
+    sin_angle = np.abs(dx * direction[1] - dy * direction[0]) / np.maximum(length, 1e-9)
+    mid_x, mid_y = (seg[:, 0] + seg[:, 2]) / 2.0, (seg[:, 1] + seg[:, 3]) / 2.0
+    distance = np.hypot(mid_x - center[0], mid_y - center[1])
+
+    ok = (length >= MIN_SEGMENT_PT) & (sin_angle <= PARALLEL_TOLERANCE) & (distance <= MATCH_RADIUS_PT)
+    if not ok.any():
+        return None
+    return int(candidates[ok][np.argmin(distance[ok])])
+
+
+# ✅ FUNCTION: Calibrate a Page
+def calibrate_page(page, segments=None):
+    """Return (scale_info, dimension rows) with the page's feet-per-point scale.
+
+    Dimension strings are matched to the nearest parallel vector segment and
+    the median real/drawn ratio wins if enough of them agree; otherwise the
+    sheet's scale note (e.g. 1/4" = 1'-0") is used.
+    """
+    if segments is None:
+        segments, _ = read_page_geometry(page)
+    lines = list(_text_lines(page))
+    index = build_segment_index(segments) if len(segments) else {}
+
+    note_ratio, note_text = None, None
+    for text, _, _ in lines:
+        ratio = parse_scale_note(text)
+        if ratio:
+            note_ratio, note_text = ratio, text
+            break
+
+    imperial = any(FEET_INCHES.search(text) or INCHES.search(text) for text, _, _ in lines)
+    rows = []
+    for text, bbox, direction in lines:
+        if parse_scale_note(text):
+            continue
+        dimensions = parse_dimensions(text, metric=not imperial)
+        for matched, feet in dimensions:
+            bare = matched.isdigit()  # Unitless millimetres need a dimension line to count
+            row = {"Text": matched, "Feet": feet, "X": (bbox[0] + bbox[2]) / 2, "Y": (bbox[1] + bbox[3]) / 2,
+                   "Segment Length (pt)": None, "Feet per Point": None}
+            if len(dimensions) == 1 and index:
+                match = _nearest_parallel_segment(segments, index, (row["X"], row["Y"]), direction)
+                if match is not None:
+                    x0, y0, x1, y1 = segments[match]
+                    row["Segment Length (pt)"] = float(np.hypot(x1 - x0, y1 - y0))
+                    row["Feet per Point"] = feet / row["Segment Length (pt)"]
+            if bare and row["Feet per Point"] is None:
+                continue
+            rows.append(row)
+
+    matched = [row["Feet per Point"] for row in rows if row["Feet per Point"]]
+    if len(matched) >= MIN_MATCHES or (matched and not note_ratio):
+        ft_per_pt, source = statistics.median(matched), "dimensions"
+    elif note_ratio:
+        ft_per_pt, source = note_ratio / POINTS_PER_INCH / 12, "scale note"
+    else:
+        ft_per_pt, source = None, "none"
+
+    scale_info = {
+        "Scale Note": note_text,
+        "Note Ratio": note_ratio,
+        "Dimensions Found": len(rows),
+        "Dimensions Matched": len(matched),
+        "Feet per Point": ft_per_pt,
+        "Source": source,
+    }
+    return scale_info, rows
+
+
+# ✅ FUNCTION: Areas Straight from PDF Geometry
+def compute_page_areas(rings, ft_per_pt):
+    """Area, perimeter and bounds (points) of every closed path, scaled to feet."""
+    ring_count = len(rings["layer"])
+    columns = ["Layer", "Area (sq ft)", "Perimeter (ft)", "Min X", "Min Y", "Max X", "Max Y"]
+    if ring_count == 0 or not ft_per_pt:
+        return pd.DataFrame(columns=columns)
+
+    bulge = np.zeros(len(rings["x"]))
+    area, perimeter = compute_ring_metrics(rings["x"], rings["y"], bulge, rings["ring"], ring_count)
+    bounds = compute_ring_bounds(rings["x"], rings["y"], bulge, rings["ring"], ring_count)
+    df = pd.DataFrame({
+        "Layer": rings["layer"],
+        "Area (sq ft)": area * ft_per_pt ** 2,
+        "Perimeter (ft)": perimeter * ft_per_pt,
+        "Min X": bounds[0], "Min Y": bounds[1], "Max X": bounds[2], "Max Y": bounds[3],
+    })
+    return df[df["Area (sq ft)"] >= MIN_AREA_SQFT].reset_index(drop=True)
+
+
+# ✅ FUNCTION: Measure a Whole PDF
+def measure_pdf(doc, pages=None):
+    """Calibrate pages of an open fitz document; returns (scales, dimensions, areas) DataFrames."""
+    scales, dimensions, areas = [], [], []
+    for page_number, page in enumerate(doc, start=1):
+        if pages is not None and page_number not in pages:
+            continue
+        segments, rings = read_page_geometry(page)
+        scale_info, rows = calibrate_page(page, segments)
+        scales.append({"Page": page_number, **scale_info})
+        dimensions.extend({"Page": page_number, **row} for row in rows)
+        page_areas = compute_page_areas(rings, scale_info["Feet per Point"])
+        page_areas.insert(0, "Page", page_number)
+        areas.append(page_areas)
+        print(f"📐 Page {page_number}: {scale_info['Dimensions Matched']}/{scale_info['Dimensions Found']} "
+              f"dimensions matched, scale from {scale_info['Source']}")
+    area_df = pd.concat(areas, ignore_index=True) if areas else pd.DataFrame()
+    return pd.DataFrame(scales), pd.DataFrame(dimensions), area_df
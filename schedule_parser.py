@@ -0,0 +1,301 @@
+import re
+import pandas as pd
+from pdf_measure import parse_dimensions
+
+# 📌 OUTPUT FORMAT (same columns the LLM prompt asks for)
+OUTPUT_COLUMNS = [
+    "Floor Level", "Room Name", "Area (sq ft)", "Ceiling Height (ft)", "Material",
+    "Material Type", "Count", "Estimated Quantity", "Unit of Measure",
+]
+DEFAULT_FLOOR = "Ground Floor"
+
+# 📌 CONNECTOR CODES (hold-downs and straps)
+CONNECTOR_CODE = re.compile(r"\b((?:HDU|MSTC?|MSTA|STHD|HTT|LSTA|CS)\d+[A-Z]?)\b", re.IGNORECASE)
+
+# 📌 HEADER KEYWORDS → COLUMN ROLE (first match wins, so specific phrases come first)
+ROLE_KEYWORDS = [
+    ("qty", ("QTY", "QUANTITY", "COUNT", "QUAN", "NO. REQ")),
+    ("area", ("AREA",)),
+    ("ceiling_height", ("CLG HT", "CLG. HT", "CEILING HT", "CEILING HEIGHT", "CLG HEIGHT")),
+    ("floor_level", ("FLOOR LEVEL", "LEVEL", "STORY", "STOREY")),
+    ("room_no", ("ROOM NO", "ROOM #", "ROOM NUMBER", "RM NO", "RM #")),
+    ("room", ("ROOM NAME", "ROOM", "SPACE", "LOCATION")),
+    ("floor", ("FLOOR", "FLR")),
+    ("base", ("BASE",)),
+    ("wall", ("WALLS", "WALL")),
+    ("ceiling", ("CEILING", "CLG")),
+    ("model", ("MODEL", "HOLDOWN", "HOLD-DOWN", "HOLD DOWN", "STRAP", "CONNECTOR", "PART")),
+    ("symbol", ("SYMBOL", "ABBREVIATION", "ABBREV")),
+    ("mark", ("MARK", "TAG", "NO.", "NO", "#", "ID")),
+    ("size", ("SIZE",)),
+    ("width", ("WIDTH", "WD")),
+    ("height", ("HEIGHT", "HT")),
+    ("type", ("TYPE",)),
+    ("material", ("MATERIAL", "MATL")),
+    ("description", ("DESCRIPTION", "REMARKS", "NOTES", "COMMENTS")),
+]
+FINISH_ROLES = ("floor", "base", "wall", "ceiling")
+HEADER_SEARCH_ROWS = 4
+TITLE_SEARCH_PT = 36  # Text this far above a table (in PDF points) can be its printed title
+MIN_STRIPPED_RUN = 3  # Consecutive text lines that must match table cells before they are removed
+
+
+def _clean(cell):
+    return re.sub(r"\s+", " ", str(cell or "")).strip()
+
+
+def _has_keyword(text, keyword):
+    return re.search(rf"(?<![A-Z0-9]){re.escape(keyword)}(?![A-Z0-9])", text) is not None
+
+
+def _column_roles(header):
+    """Map role -> column index for a header row; each role takes its first column."""
+    roles = {}
+    for index, cell in enumerate(header):
+        text = _clean(cell).upper()
+        if not text:
+            continue
+        for role, keywords in ROLE_KEYWORDS:
+            if any(_has_keyword(text, keyword) for keyword in keywords):
+                roles.setdefault(role, index)
+                break
+    return roles
+
+
+def _number(text):
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", _clean(text))
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+def _feet(text):
+    dimensions = parse_dimensions(_clean(text))
+    return dimensions[0][1] if dimensions else _number(text)
+
+
+def _find_header(rows):
+    """Return (title, header_index, roles) for the first row that names two or more columns."""
+    titles = []
+    for index, row in enumerate(rows[:HEADER_SEARCH_ROWS]):
+        cells = [_clean(cell) for cell in row if _clean(cell)]
+        roles = _column_roles(row)
+        if len(roles) >= 2:
+            return " ".join(titles).upper(), index, roles
+        titles.extend(cells)
+    return " ".join(titles).upper(), None, {}
+
+
+# ✅ FUNCTION: Detect Schedule Type
+def classify_table(rows, title=""):
+    """Return (kind, header_index, roles); kind is None when the table is not a known layout.
+
+    `title` is text printed above the table (outside its cells), if any.
+    """
+    row_title, header_index, roles = _find_header(rows)
+    title = f"{_clean(title).upper()} {row_title}".strip()
+    header_text = " ".join(_clean(cell) for cell in rows[header_index]).upper() if header_index is not None else ""
+    heading = f"{title} {header_text}"
+    body = rows[header_index + 1:] if header_index is not None else rows
+
+    if "LEGEND" in title or "ABBREVIATION" in title or ({"symbol", "description"} <= roles.keys()):
+        return "legend", header_index, roles
+    if header_index is None:
+        return None, None, roles
+    if "DOOR" in heading:
+        return "door", header_index, roles
+    if "WINDOW" in heading:
+        return "window", header_index, roles
+    if ("room" in roles or "room_no" in roles) and any(role in roles for role in FINISH_ROLES):
+        return "room_finish", header_index, roles
+    if "model" in roles or any(CONNECTOR_CODE.search(_clean(cell)) for row in body for cell in row):
+        return "connector", header_index, roles
+    return None, header_index, roles
+
+
+def _cell(row, roles, role):
+    index = roles.get(role)
+    return _clean(row[index]) if index is not None and index < len(row) else ""
+
+
+def _room_name(row, roles):
+    name, number = _cell(row, roles, "room"), _cell(row, roles, "room_no")
+    return f"{number} {name}".strip() if number and name else name or number
+
+
+def _room_finish_rows(body, roles):
+    rows = []
+    for row in body:
+        room = _room_name(row, roles)
+        if not room:
+            continue
+        area = _number(_cell(row, roles, "area"))
+        base = {
+            "Floor Level": _cell(row, roles, "floor_level") or DEFAULT_FLOOR,
+            "Room Name": room,
+            "Area (sq ft)": area,
+            "Ceiling Height (ft)": _feet(_cell(row, roles, "ceiling_height")),
+        }
+        for role, unit, uses_area in (("floor", "sq ft", True), ("base", "linear ft", False),
+                                      ("wall", "sq ft", False), ("ceiling", "sq ft", True)):
+            finish = _cell(row, roles, role)
+            if finish and finish not in ("-", "--", "N/A"):
+                rows.append({**base, "Material": f"{role.title()}: {finish}", "Material Type": "Finish",
+                             "Count": None, "Estimated Quantity": area if uses_area else None,
+                             "Unit of Measure": unit})
+    return rows
+
+
+def _opening_rows(body, roles, kind, legend):
+    rows = []
+    for row in body:
+        mark = _cell(row, roles, "mark")
+        size = _cell(row, roles, "size")
+        if not size and (_cell(row, roles, "width") or _cell(row, roles, "height")):
+            size = f"{_cell(row, roles, 'width')} x {_cell(row, roles, 'height')}".strip(" x")
+        details = [size, _cell(row, roles, "type"), _cell(row, roles, "material")]
+        if not mark and not any(details):
+            continue
+        type_code = _cell(row, roles, "type")
+        if type_code in legend:
+            details.append(legend[type_code])
+        description = " ".join(part for part in [mark] + details if part)
+        rows.append({
+            "Floor Level": _cell(row, roles, "floor_level") or DEFAULT_FLOOR,
+            "Room Name": _room_name(row, roles),
+            "Area (sq ft)": None,
+            "Ceiling Height (ft)": None,
+            "Material": f"{kind.title()} {description}".strip(),
+            "Material Type": "Fixture",
+            "Count": _number(_cell(row, roles, "qty")) or 1,
+            "Estimated Quantity": None,
+            "Unit of Measure": "each",
+        })
+    return rows
+
+
+def _connector_rows(body, roles, legend):
+    rows = []
+    for row in body:
+        text = _cell(row, roles, "model") or " ".join(_clean(cell) for cell in row)
+        match = CONNECTOR_CODE.search(text)
+        if not match:
+            continue
+        code = match.group(1).upper()
+        rows.append({
+            "Floor Level": _cell(row, roles, "floor_level") or DEFAULT_FLOOR,
+            "Room Name": _room_name(row, roles),
+            "Area (sq ft)": None,
+            "Ceiling Height (ft)": None,
+            "Material": f"{code} - {legend[code]}" if code in legend else code,
+            "Material Type": "Connector",
+            "Count": _number(_cell(row, roles, "qty")) or 1,
+            "Estimated Quantity": None,
+            "Unit of Measure": "each",
+        })
+    return rows
+
+
+def _legend_entries(rows, header_index, roles):
+    """Return {code: description} from a two-column legend or abbreviation table."""
+    body = rows[header_index + 1:] if header_index is not None else rows
+    code_index = roles.get("symbol", roles.get("mark", 0))
+    text_index = roles.get("description", 1)
+    legend = {}
+    for row in body:
+        if max(code_index, text_index) < len(row):
+            code, text = _clean(row[code_index]), _clean(row[text_index])
+            if code and text:
+                legend[code.upper()] = text
+    return legend
+
+
+# ✅ FUNCTION: Tables of a Page with Their Titles
+def page_tables(page):
+    """Return [(rows, title), ...] for a pdfplumber page; title is the text just above the table."""
+    found = []
+    for table in page.find_tables():
+        x0, top, x1, _ = table.bbox
+        title = ""
+        if top > 0:
+            above = page.crop((x0, max(top - TITLE_SEARCH_PT, 0), x1, top))
+            title = " ".join((above.extract_text() or "").split())
+        found.append((table.extract(), title))
+    return found
+
+
+# ✅ FUNCTION: Parse Schedule and Legend Tables
+def parse_schedules(tables, titles=None):
+    """Turn known schedule layouts into typed rows without the LLM.
+
+    `tables` are lists of rows as returned by pdfplumber's extract_tables(),
+    `titles` the text above each table (see page_tables). Returns (rows
+    DataFrame, parsed tables, unparsed tables); only the unparsed tables
+    (and leftover text) need to go to the LLM.
+    """
+    titles = titles if titles is not None else [""] * len(tables)
+    classified = [(table, *classify_table(table, title)) for table, title in zip(tables, titles) if table]
+
+    # Legends first so schedules can expand the codes they define
+    legend = {}
+    for table, kind, header_index, roles in classified:
+        if kind == "legend":
+            legend.update(_legend_entries(table, header_index, roles))
+
+    rows, parsed, unparsed = [], [], []
+    for table, kind, header_index, roles in classified:
+        body = table[header_index + 1:] if header_index is not None else table
+        if kind == "room_finish":
+            table_rows = _room_finish_rows(body, roles)
+        elif kind in ("door", "window"):
+            table_rows = _opening_rows(body, roles, kind, legend)
+        elif kind == "connector":
+            table_rows = _connector_rows(body, roles, legend)
+        elif kind == "legend":
+            parsed.append(table)
+            continue
+        else:
+            table_rows = []
+
+        if table_rows:
+            rows.extend(table_rows)
+            parsed.append(table)
+        else:
+            unparsed.append(table)
+
+    df = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+    if not df.empty:
+        # One row per material and location, like the LLM output
+        keys = ["Floor Level", "Room Name", "Material", "Material Type", "Unit of Measure"]
+        df = (df.groupby(keys, sort=False, dropna=False)
+                .agg({"Area (sq ft)": "first", "Ceiling Height (ft)": "first",
+                      "Count": lambda s: s.sum(min_count=1), "Estimated Quantity": lambda s: s.sum(min_count=1)})
+                .reset_index()[OUTPUT_COLUMNS])
+    print(f"📋 Parsed {len(parsed)} schedule/legend tables into {len(df)} rows; {len(unparsed)} left for the LLM")
+    return df, parsed, unparsed
+
+
+# ✅ FUNCTION: Remove Parsed Schedules from Text
+def strip_parsed_text(text, parsed_tables):
+    """Drop runs of text lines that repeat cells of parsed tables.
+
+    Only runs of MIN_STRIPPED_RUN or more matching lines are removed, so a room
+    label on the plan that also appears in a schedule is kept.
+    """
+    cells = {
+        _clean(part).upper()
+        for table in parsed_tables for row in table for cell in row
+        for part in str(cell or "").splitlines() if _clean(part)
+    }
+    lines = text.splitlines()
+    matches = [_clean(line).upper() in cells for line in lines]
+
+    keep = [True] * len(lines)
+    run = []
+    for index, line in enumerate(lines + [None]):
+        if line is not None and (matches[index] or (run and not _clean(line))):
+            run.append(index)
+            continue
+        if sum(matches[i] for i in run) >= MIN_STRIPPED_RUN:
+            for i in run:
+                keep[i] = False
+        run = []
+    return "\n".join(line for line, kept in zip(lines, keep) if kept)
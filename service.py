@@ -0,0 +1,423 @@
+import argparse
+import functools
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import merge
+
+# 🛠️ CONFIGURATION
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+JOBS_FOLDER = os.path.join("extracted_data", "jobs")
+DEFAULT_WORKERS = 2
+DEFAULT_PRIORITY = 5  # Lower numbers run first
+MAX_UPLOAD_BYTES = 500 * 1024 * 1024
+MAX_FINISHED_JOBS = 200  # Older finished jobs are dropped from the registry (their files stay on disk)
+
+# 📌 WARM STATE (shared by all workers)
+RATES = dict(merge.MATERIAL_RATES)
+
+# 📌 JOB REGISTRY
+JOBS = {}
+JOBS_LOCK = threading.Lock()
+JOB_QUEUE = queue.PriorityQueue()
+_job_sequence = itertools.count()
+
+# 📌 PyMuPDF is not thread-safe: stages that use it run one at a time across workers
+# (AI room detection and region OCR take the lock only while they render)
+PDF_LOCK = merge.PDF_LOCK
+
+
+# ✅ STAGES: Each stage takes the job dict and stores its outputs on it;
+# returning SKIPPED marks a stage the job's sheets do not need
+SKIPPED = "skipped"
+
+
+def _pdf_stage(run_stage):
+    """Run a stage that uses PyMuPDF while holding PDF_LOCK."""
+    @functools.wraps(run_stage)
+    def run(job):
+        with PDF_LOCK:
+            return run_stage(job)
+    return run
+
+
+@_pdf_stage
+def stage_classify(job):
+    job["sheets"] = merge.classify_pdf_sheets(job["input"], output_folder=job["folder"])
+
+
+def _pages(job, stage):
+    """Pages that need `stage` (None = all pages, e.g. for DXF jobs)."""
+    if job.get("sheets") is None:
+        return None
+    return merge.pages_for_stage(job["sheets"], stage)
+
+
+def stage_convert(job):
+    if _pages(job, "rooms") == set():
+        return SKIPPED
+    dxf_path = os.path.join(job["folder"], os.path.splitext(os.path.basename(job["input"]))[0] + ".dxf")
+    if not merge.convert_pdf_to_dxf(job["input"], dxf_path):
+        # No Inkscape (or a bad PDF): the DXF stages skip, the PDF-only stages still run
+        print(f"⚠️ Job {job['id']}: PDF to DXF conversion failed; skipping the DXF stages")
+        return SKIPPED
+    job["dxf"] = dxf_path
+
+
+def stage_rooms(job):
+    if job["dxf"] is None:
+        return SKIPPED
+    job["rooms"] = merge.extract_rooms_from_dxf(job["dxf"], output_folder=job["folder"])
+
+
+def stage_materials(job):
+    if job["dxf"] is None:
+        return SKIPPED
+    merge.extract_materials_from_dxf(job["dxf"], output_folder=job["folder"])
+
+
+def _dxf_scale(job):
+    """Feet per drawing unit, read from the DXF header once per job."""
+    if job.get("scale") is None:
+        job["scale"] = merge.detect_dxf_units(job["dxf"])
+    return job["scale"]
+
+
+def stage_areas(job):
+    if job["dxf"] is None:
+        return SKIPPED
+    job["areas"] = merge.extract_areas_from_dxf(job["dxf"], output_folder=job["folder"], scale_factor=_dxf_scale(job))
+
+
+def stage_cad_symbols(job):
+    if job["dxf"] is None:
+        return SKIPPED
+    merge.count_symbols_in_dxf(job["dxf"], job.get("rooms"), job.get("areas"), output_folder=job["folder"],
+                               scale_factor=_dxf_scale(job))
+
+
+def stage_cad_walls(job):
+    if job["dxf"] is None:
+        return SKIPPED
+    room_lengths = merge.extract_linear_takeoff_from_dxf(job["dxf"], job.get("rooms"), job.get("areas"),
+                                                         output_folder=job["folder"], scale_factor=_dxf_scale(job))
+    _save_wall_estimate(job, room_lengths, "cad")
+
+
+def _save_wall_estimate(job, room_lengths, source):
+    df = merge.estimate_wall_materials(room_lengths, RATES)
+    df.to_csv(os.path.join(job["folder"], f"{source}_wall_material_estimation.csv"), index=False)
+
+
+@_pdf_stage
+def stage_vector(job):
+    merge.extract_vector_from_pdf(job["input"], output_folder=job["folder"])
+
+
+@_pdf_stage
+def stage_measure(job):
+    pages = _pages(job, "measure")
+    if pages == set():
+        return SKIPPED
+    job["pdf_rooms"] = merge.extract_measurements_from_pdf(job["input"], output_folder=job["folder"], pages=pages)
+
+
+@_pdf_stage
+def stage_schedules(job):
+    pages = _pages(job, "tables")
+    if pages == set():
+        return SKIPPED
+    merge.extract_schedules_from_pdf(job["input"], output_folder=job["folder"], pages=pages)
+
+
+@_pdf_stage
+def stage_symbols(job):
+    pages = _pages(job, "symbols")
+    if pages == set():
+        return SKIPPED
+    merge.count_symbols_in_pdf(job["input"], output_folder=job["folder"], pages=pages)
+
+
+@_pdf_stage
+def stage_walls(job):
+    pages = _pages(job, "walls")
+    if pages == set():
+        return SKIPPED
+    room_lengths = merge.extract_linear_takeoff_from_pdf(job["input"], output_folder=job["folder"], pages=pages)
+    _save_wall_estimate(job, room_lengths, "pdf")
+
+
+def stage_ocr(job):
+    pages = _pages(job, "ocr")
+    if pages == set():
+        return SKIPPED
+    merge.extract_ocr_from_pdf(job["input"], output_folder=job["folder"], pages=pages)
+
+
+def stage_estimate(job):
+    """Room-wise estimate from the DXF rooms and areas, else from the calibrated PDF room areas."""
+    if job.get("rooms") is not None and job.get("areas") is not None:
+        df = merge.estimate_room_materials(job["rooms"], job["areas"], RATES)
+    elif job.get("pdf_rooms") is not None and not job["pdf_rooms"].empty:
+        df = merge.estimate_pdf_room_materials(job["pdf_rooms"], RATES)
+    else:
+        return SKIPPED
+    result_file = os.path.join(job["folder"], "room_material_estimation.csv")
+    df.to_csv(result_file, index=False)
+    job["result"] = result_file
+
+
+CAD_STAGES = [
+    ("rooms", stage_rooms),
+    ("materials", stage_materials),
+    ("areas", stage_areas),
+    ("cad_symbols", stage_cad_symbols),
+    ("cad_walls", stage_cad_walls),
+]
+DXF_STAGES = CAD_STAGES + [("estimate", stage_estimate)]
+PDF_STAGES = [("classify", stage_classify), ("convert", stage_convert)] + CAD_STAGES + [
+    ("vector", stage_vector),
+    ("measure", stage_measure),
+    ("schedules", stage_schedules),
+    ("symbols", stage_symbols),
+    ("walls", stage_walls),
+    ("ocr", stage_ocr),
+    ("estimate", stage_estimate),  # Last: PDFs without a DXF estimate from the measure stage
+]
+
+
+# ✅ FUNCTION: Warm Up Shared Models and Tables
+def warm_up(rates_file=None, yolo=True):
+    """Load the YOLO model, OCR workers and material rates once for all jobs."""
+    RATES.clear()
+    RATES.update(merge.load_material_rates(rates_file))
+    merge.get_ocr_pool()
+    if yolo:
+        try:
+            merge.load_yolo_model()
+            print(f"🔥 YOLO model loaded: {merge.YOLO_MODEL_PATH}")
+        except Exception as e:
+            print(f"⚠️ YOLO model not loaded ({e}); AI room detection will load it on demand.")
+
+
+# ✅ FUNCTION: Submit a Job
+def submit_job(name, data, priority=DEFAULT_PRIORITY):
+    """Store an uploaded PDF/DXF and queue it; returns the job id."""
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in (".pdf", ".dxf"):
+        raise ValueError("Only .pdf and .dxf files are supported")
+
+    job_id = uuid.uuid4().hex[:12]
+    folder = os.path.join(JOBS_FOLDER, job_id)
+    os.makedirs(folder, exist_ok=True)
+    input_path = os.path.join(folder, job_id + extension)  # Never use the client's file name on disk
+    with open(input_path, "wb") as f:
+        f.write(data)
+    return queue_job(input_path, folder, priority, job_id, name=os.path.basename(name))
+
+
+# ✅ FUNCTION: Queue a File Already on Disk
+def queue_job(input_path, folder, priority=DEFAULT_PRIORITY, job_id=None, on_done=None, name=None):
+    """Queue a PDF/DXF for the workers; outputs go to `folder`, `on_done(job)` runs when it ends."""
+    extension = os.path.splitext(input_path)[1].lower()
+    if extension not in (".pdf", ".dxf"):
+        raise ValueError("Only .pdf and .dxf files are supported")
+
+    job_id = job_id or uuid.uuid4().hex[:12]
+    os.makedirs(folder, exist_ok=True)
+    stages = PDF_STAGES if extension == ".pdf" else DXF_STAGES
+    job = {
+        "id": job_id,
+        "name": name or os.path.basename(input_path),
+        "input": input_path,
+        "dxf": input_path if extension == ".dxf" else None,
+        "sheets": None,
+        "folder": folder,
+        "priority": priority,
+        "status": "queued",
+        "stages": {stage: "pending" for stage, _ in stages},
+        "error": None,
+        "submitted": time.time(),
+        "started": None,
+        "finished": None,
+        "result": None,
+        "on_done": on_done,
+    }
+    with JOBS_LOCK:
+        JOBS[job_id] = job
+    JOB_QUEUE.put((priority, next(_job_sequence), job_id))
+    print(f"📥 Job {job_id} queued: {job['name']} (priority {priority})")
+    return job_id
+
+
+# ✅ FUNCTION: Run a Job Through Its Stages
+def run_job(job):
+    _run_stages(job)
+    if job.get("on_done") is not None:
+        try:
+            job["on_done"](job)
+        except Exception as e:
+            print(f"⚠️ Job {job['id']}: completion hook failed: {e}")
+    _release(job)
+
+
+def _release(job):
+    """Keep only status and output paths of a finished job, and evict the oldest finished jobs."""
+    for key in ("rooms", "areas", "pdf_rooms", "sheets", "on_done"):
+        job.pop(key, None)
+    with JOBS_LOCK:
+        finished = [j for j in JOBS.values() if j["finished"] is not None]
+        finished.sort(key=lambda j: j["finished"])
+        for old in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del JOBS[old["id"]]
+
+
+def _run_stages(job):
+    stages = PDF_STAGES if job["input"].lower().endswith(".pdf") else DXF_STAGES
+    job["status"] = "running"
+    job["started"] = time.time()
+    for stage, run_stage in stages:
+        job["stages"][stage] = "running"
+        try:
+            outcome = run_stage(job)
+        except Exception as e:
+            job["stages"][stage] = "failed"
+            job["status"] = "failed"
+            job["error"] = f"{stage}: {e}"
+            job["finished"] = time.time()
+            print(f"❌ Job {job['id']} failed in {stage}: {e}")
+            return
+        job["stages"][stage] = SKIPPED if outcome == SKIPPED else "done"
+    if job["result"] is None:
+        # Every stage ran, but there were no room labels or no drawing scale to estimate from
+        job["status"] = "partial"
+        job["error"] = "estimate: no room-wise result (no labelled rooms or drawing scale)"
+    else:
+        job["status"] = "done"
+    job["finished"] = time.time()
+    print(f"✅ Job {job['id']} {job['status']} in {job['finished'] - job['started']:.1f}s")
+
+
+def worker_loop():
+    while True:
+        _, _, job_id = JOB_QUEUE.get()
+        try:
+            with JOBS_LOCK:
+                job = JOBS.get(job_id)
+            if job is not None:
+                run_job(job)
+        finally:
+            JOB_QUEUE.task_done()
+
+
+# ✅ FUNCTION: Start Worker Pool
+def start_workers(count=DEFAULT_WORKERS):
+    workers = [threading.Thread(target=worker_loop, name=f"estimator-{i}", daemon=True) for i in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def job_status(job):
+    """Public view of a job (no DataFrames or local paths)."""
+    return {
+        key: job[key]
+        for key in ("id", "name", "priority", "status", "stages", "error", "submitted", "started", "finished")
+    } | {"result_ready": job["result"] is not None}
+
+
+# ✅ HTTP API
+class EstimationHandler(BaseHTTPRequestHandler):
+    """POST /jobs?name=plan.pdf&priority=1 (raw file body), GET /jobs, GET /jobs/<id>, GET /jobs/<id>/result"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _get_job(self, job_id):
+        with JOBS_LOCK:
+            return JOBS.get(job_id)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "not found"})
+
+        query = parse_qs(url.query)
+        name = query.get("name", [""])[0]
+        length = int(self.headers.get("Content-Length", 0))
+        if not name or length <= 0:
+            return self._send_json(400, {"error": "name query parameter and file body are required"})
+        if length > MAX_UPLOAD_BYTES:
+            return self._send_json(413, {"error": "file too large"})
+
+        try:
+            priority = int(query.get("priority", [DEFAULT_PRIORITY])[0])
+            job_id = submit_job(name, self.rfile.read(length), priority)
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+        self._send_json(202, {"id": job_id})
+
+    def do_GET(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok", "queued": JOB_QUEUE.qsize()})
+        if parts == ["jobs"]:
+            with JOBS_LOCK:
+                jobs = [job_status(job) for job in JOBS.values()]
+            return self._send_json(200, jobs)
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self._get_job(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "unknown job"})
+            if len(parts) == 2:
+                return self._send_json(200, job_status(job))
+            if parts[2] == "result":
+                if job["result"] is None:
+                    return self._send_json(409, {"error": f"job is {job['status']}"})
+                with open(job["result"], "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Disposition", f'attachment; filename="{job["id"]}_room_estimation.csv"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self._send_json(404, {"error": "not found"})
+
+
+# ✅ MAIN EXECUTION
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local material estimation service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent jobs")
+    parser.add_argument("--rates", help="CSV with Material,Rate columns (per 100 sq ft)")
+    parser.add_argument("--no-yolo", action="store_true", help="skip preloading the YOLO model")
+    args = parser.parse_args()
+
+    os.makedirs(JOBS_FOLDER, exist_ok=True)
+    warm_up(args.rates, yolo=not args.no_yolo)
+    start_workers(args.workers)
+
+    server = ThreadingHTTPServer((args.host, args.port), EstimationHandler)
+    print(f"🚀 Estimation service on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 Shutting down.")
+        server.server_close()
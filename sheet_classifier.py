@@ -0,0 +1,141 @@
+import pandas as pd
+
+# 📌 TITLE-BLOCK KEYWORDS PER SHEET TYPE
+SHEET_KEYWORDS = {
+    "title": ("COVER SHEET", "TITLE SHEET", "SHEET INDEX", "DRAWING INDEX", "PROJECT DIRECTORY", "VICINITY MAP"),
+    "notes": ("GENERAL NOTES", "STRUCTURAL NOTES", "SPECIFICATIONS", "CODE ANALYSIS", "ABBREVIATIONS"),
+    "schedule": ("SCHEDULE",),
+    "floor_plan": ("FLOOR PLAN", "FOUNDATION PLAN", "FRAMING PLAN", "ROOF PLAN", "CEILING PLAN", "SITE PLAN"),
+    "elevation": ("ELEVATION",),
+    "section": ("BUILDING SECTION", "WALL SECTION", "SECTION"),
+    "detail": ("DETAIL",),
+}
+DRAWING_SHEETS = ("floor_plan", "elevation", "section", "detail")
+TITLE_BLOCK_WEIGHT = 3        # Keyword hits inside the title block count this many times
+
+# 📌 FEATURE THRESHOLDS
+SCANNED_IMAGE_COVERAGE = 0.5  # Fraction of the page covered by raster images
+SCANNED_MAX_TEXT = 50         # Characters in the text layer of a scanned sheet
+SPARSE_DRAWINGS = 50          # Path groups on a cover or mostly empty sheet
+PLAN_MIN_DRAWINGS = 500       # Path groups on a real drawing sheet
+NOTES_TEXT_DENSITY = 15       # Characters per square inch on text-heavy sheets
+TABLE_RULING_DENSITY = 2.0    # Axis-aligned rulings per square inch on schedule sheets
+
+# 📌 PIPELINE STAGES EACH SHEET TYPE NEEDS
+ALL_STAGES = {"text", "ocr", "tables", "measure", "detect", "rooms", "symbols", "walls"}
+SHEET_STAGES = {
+    "title": {"text"},
+    "notes": {"text", "tables"},
+    "schedule": {"text", "tables"},
+    "floor_plan": {"text", "tables", "measure", "detect", "rooms", "symbols", "walls"},  # Plans often carry door/window schedules
+    "elevation": {"text", "measure"},
+    "section": {"text", "measure"},
+    "detail": {"text", "measure"},
+    "scanned": {"ocr", "detect", "rooms"},
+    "unknown": ALL_STAGES,
+}
+
+
+# ✅ FUNCTION: Compute Cheap Page Features
+def page_features(page, drawings=None):
+    """Features from one fitz page; pass `drawings` if get_drawings() was already called."""
+    if drawings is None:
+        drawings = page.get_drawings()
+    page_area = page.rect.width * page.rect.height
+    square_inches = page_area / (72 * 72)
+
+    segments = axis_aligned = curves = 0
+    for path in drawings:
+        for item in path["items"]:
+            kind = item[0]
+            if kind in ("re", "qu"):
+                segments += 4
+                axis_aligned += 4 if kind == "re" else 0
+            elif kind == "l":
+                segments += 1
+                p1, p2 = item[1], item[2]
+                if abs(p1.x - p2.x) < 0.5 or abs(p1.y - p2.y) < 0.5:
+                    axis_aligned += 1
+            elif kind == "c":
+                curves += 1
+
+    text_chars = 0
+    keyword_hits = dict.fromkeys(SHEET_KEYWORDS, 0)
+    title_block_x = page.rect.x0 + 0.75 * page.rect.width
+    title_block_y = page.rect.y0 + 0.85 * page.rect.height
+    for x0, y0, _, _, text, *_ in page.get_text("blocks"):
+        text_chars += len(text.strip())
+        upper = text.upper()
+        weight = TITLE_BLOCK_WEIGHT if x0 >= title_block_x or y0 >= title_block_y else 1
+        for sheet_type, keywords in SHEET_KEYWORDS.items():
+            # Longer phrases first so "WALL SECTION" is not also counted as "SECTION"
+            for keyword in keywords:
+                if keyword in upper:
+                    keyword_hits[sheet_type] += weight
+                    break
+
+    image_area = 0.0
+    for info in page.get_image_info():
+        bbox = page.rect & info["bbox"]
+        if not bbox.is_empty:
+            image_area += bbox.width * bbox.height
+
+    return {
+        "drawings": len(drawings),
+        "segments": segments,
+        "curves": curves,
+        "text_chars": text_chars,
+        "text_density": text_chars / square_inches if square_inches else 0.0,
+        "ruling_density": axis_aligned / square_inches if square_inches else 0.0,
+        "image_coverage": min(image_area / page_area, 1.0) if page_area else 0.0,
+        "keyword_hits": keyword_hits,
+    }
+
+
+# ✅ FUNCTION: Classify a Sheet from Its Features
+def classify_sheet(features):
+    if features["image_coverage"] >= SCANNED_IMAGE_COVERAGE and features["text_chars"] < SCANNED_MAX_TEXT:
+        return "scanned"
+
+    hits = features["keyword_hits"]
+    keyword = max(hits, key=hits.get) if any(hits.values()) else None
+    drawing_keyword = max(DRAWING_SHEETS, key=hits.get) if any(hits[t] for t in DRAWING_SHEETS) else None
+    many_drawings = features["drawings"] >= PLAN_MIN_DRAWINGS
+
+    if many_drawings and drawing_keyword:
+        return drawing_keyword
+    if features["drawings"] < SPARSE_DRAWINGS and features["text_density"] < NOTES_TEXT_DENSITY:
+        return keyword or "title"
+    if features["text_density"] >= NOTES_TEXT_DENSITY:
+        if features["ruling_density"] >= TABLE_RULING_DENSITY or keyword == "schedule":
+            return "schedule"
+        if not many_drawings:
+            return "notes"
+    if keyword:
+        return keyword
+    return "unknown"
+
+
+# ✅ FUNCTION: Classify Every Sheet of a PDF
+def classify_sheets(doc):
+    """Return a DataFrame with one row per page: sheet type, stages and features."""
+    rows = []
+    for page_number, page in enumerate(doc, start=1):
+        features = page_features(page)
+        sheet_type = classify_sheet(features)
+        keyword_hits = features.pop("keyword_hits")
+        rows.append({
+            "Page": page_number,
+            "Sheet Type": sheet_type,
+            "Stages": " ".join(sorted(SHEET_STAGES[sheet_type])),
+            **features,
+            "keywords": " ".join(t for t, n in keyword_hits.items() if n),
+        })
+        print(f"🗂️ Page {page_number}: {sheet_type}")
+    return pd.DataFrame(rows)
+
+
+# ✅ FUNCTION: Pages That Need a Stage
+def pages_for_stage(sheets, stage):
+    """Set of page numbers whose sheet type needs `stage`."""
+    return {page for page, sheet_type in zip(sheets["Page"], sheets["Sheet Type"]) if stage in SHEET_STAGES[sheet_type]}
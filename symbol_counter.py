@@ -0,0 +1,486 @@
+import hashlib
+import re
+import numpy as np
+import pandas as pd
+from dxf_geometry import BOUNDS_COLUMNS, locate_points
+from dxf_stream import iter_modelspace, read_dxf_blocks, MAX_BLOCK_DEPTH
+from pdf_measure import read_page_geometry, compute_page_areas, parse_dimensions, parse_scale_note
+from schedule_parser import CONNECTOR_CODE, DEFAULT_FLOOR, OUTPUT_COLUMNS
+
+# 📌 SYMBOL CANDIDATES (PDF points)
+MAX_SYMBOL_PT = 36            # Largest symbol side; longer paths are walls, grids and borders
+CLUSTER_GAP_PT = 1.0          # Paths closer than this belong to the same symbol
+MIN_REPEATS = 2               # A PDF signature must occur this often to count as a symbol
+SIGNATURE_QUANT = 0.05        # Bin width of the normalized radii and chord lengths
+
+# 📌 ROOMS AND CALLOUTS
+ROOM_MIN_SIDE_PT = 2 * MAX_SYMBOL_PT  # Smaller closed paths are symbols, not rooms
+ROOM_MAX_PAGE_FRACTION = 0.5          # Larger closed paths are sheet borders
+MAX_ROOM_LABELS = 3                   # Paths holding more room-like text lines are title blocks or legends
+CALLOUT_RADIUS_PT = 36
+CALLOUT_RADIUS_FT = 3.0               # DXF callout radius in real units
+CALLOUT_TAG = re.compile(r"^[A-Z]{0,4}-?\d{1,3}[A-Z]?$")  # D1, W-3, T12A
+FLOOR_NAME = re.compile(r"\b(BASEMENT|GROUND|FIRST|SECOND|THIRD|FOURTH|FIFTH|\d+(?:ST|ND|RD|TH))\s+FLOOR\b",
+                        re.IGNORECASE)
+UNASSIGNED = "Unassigned"
+
+INSTANCE_COLUMNS = ["Page", "Floor Level", "Room Name", "Symbol", "Block", "Parts",
+                    "X", "Y", "Width", "Height", "Callout"]
+COUNT_COLUMNS = ["Floor Level", "Room Name", "Symbol", "Callout", "Count"]
+
+
+# ✅ FUNCTION: Invariant Geometric Hash
+def geometric_signature(points, chords, kinds):
+    """Hash a symbol so moved, rotated, scaled (and mirrored) copies share one key.
+
+    Points are centred on their centroid and divided by their RMS radius; the
+    sorted radii, sorted chord lengths and the count of each item kind are
+    quantized and hashed. Returns None for shapes that collapse to a point.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return None
+    offsets = points - points.mean(axis=0)
+    radii = np.hypot(offsets[:, 0], offsets[:, 1])
+    size = np.sqrt(np.mean(radii ** 2))
+    if size < 1e-9:
+        return None
+
+    radius_bins = np.sort(np.rint(radii / size / SIGNATURE_QUANT).astype(int))
+    chord_bins = np.sort(np.rint(np.asarray(chords, dtype=float) / size / SIGNATURE_QUANT).astype(int))
+    kind_counts = "".join(f"{kind}{kinds.count(kind)}" for kind in sorted(set(kinds)))
+    key = f"{kind_counts}|{radius_bins.tolist()}|{chord_bins.tolist()}"
+    return hashlib.md5(key.encode()).hexdigest()[:12]
+
+
+def _path_geometry(path):
+    """Points, chord lengths and item kinds of one get_drawings() path."""
+    points, chords, kinds = [], [], []
+    for item in path["items"]:
+        kind = item[0]
+        if kind == "re":
+            rect = item[1]
+            corners = [(rect.x0, rect.y0), (rect.x1, rect.y0), (rect.x1, rect.y1), (rect.x0, rect.y1)]
+        elif kind == "qu":
+            quad = item[1]
+            corners = [(quad.ul.x, quad.ul.y), (quad.ur.x, quad.ur.y), (quad.lr.x, quad.lr.y), (quad.ll.x, quad.ll.y)]
+        else:
+            # "l": p1, p2 / "c": p1, c1, c2, p2 (control points rotate with the curve)
+            item_points = [(p.x, p.y) for p in item[1:]]
+            points.extend(item_points)
+            chords.append(np.hypot(item_points[-1][0] - item_points[0][0], item_points[-1][1] - item_points[0][1]))
+            kinds.append(kind)
+            continue
+        points.extend(corners)
+        chords.append(np.hypot(corners[2][0] - corners[0][0], corners[2][1] - corners[0][1]))
+        kinds.append("r")  # Axis-aligned and rotated rectangles hash alike
+    if path.get("fill") is not None:
+        kinds.append("f")
+    return points, chords, kinds
+
+
+# ✅ FUNCTION: Group Touching Small Paths into Symbol Candidates
+def cluster_paths(drawings):
+    """Return lists of drawing indices; each list is one candidate symbol.
+
+    Only paths no larger than MAX_SYMBOL_PT are considered. Paths whose
+    bounding boxes come within CLUSTER_GAP_PT are joined (union-find over a
+    grid), and groups that grow past MAX_SYMBOL_PT (hatching, text) are dropped.
+    """
+    small = [index for index, path in enumerate(drawings)
+             if max(path["rect"].width, path["rect"].height) <= MAX_SYMBOL_PT]
+    if not small:
+        return []
+
+    boxes = np.array([tuple(drawings[index]["rect"]) for index in small], dtype=float)
+    grown = boxes + np.array([-CLUSTER_GAP_PT, -CLUSTER_GAP_PT, CLUSTER_GAP_PT, CLUSTER_GAP_PT])
+    cells = np.floor(grown / MAX_SYMBOL_PT).astype(int)
+    parent = np.arange(len(small))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    grid = {}
+    for i, (cx0, cy0, cx1, cy1) in enumerate(cells):
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = grid.setdefault((cx, cy), [])
+                if bucket:
+                    others = grown[bucket]
+                    touching = ((others[:, 0] <= grown[i, 2]) & (others[:, 2] >= grown[i, 0]) &
+                                (others[:, 1] <= grown[i, 3]) & (others[:, 3] >= grown[i, 1]))
+                    for j in np.asarray(bucket)[touching]:
+                        parent[find(j)] = find(i)
+                bucket.append(i)
+
+    groups = {}
+    for i in range(len(small)):
+        groups.setdefault(find(i), []).append(i)
+
+    clusters = []
+    for members in groups.values():
+        bounds = boxes[members]
+        width = bounds[:, 2].max() - bounds[:, 0].min()
+        height = bounds[:, 3].max() - bounds[:, 1].min()
+        if max(width, height) <= MAX_SYMBOL_PT:
+            clusters.append([small[i] for i in members])
+    return clusters
+
+
+# ✅ FUNCTION: Find Symbols on a Page
+def find_page_symbols(drawings):
+    """Return a DataFrame with one row per candidate symbol: signature, centre and size (points)."""
+    rows = []
+    for members in cluster_paths(drawings):
+        points, chords, kinds = [], [], []
+        for index in members:
+            path_points, path_chords, path_kinds = _path_geometry(drawings[index])
+            points.extend(path_points)
+            chords.extend(path_chords)
+            kinds.extend(path_kinds)
+        signature = geometric_signature(points, chords, kinds)
+        if signature is None:
+            continue
+        x0 = min(drawings[i]["rect"].x0 for i in members)
+        y0 = min(drawings[i]["rect"].y0 for i in members)
+        x1 = max(drawings[i]["rect"].x1 for i in members)
+        y1 = max(drawings[i]["rect"].y1 for i in members)
+        rows.append({"Symbol": signature, "Parts": len(members), "X": (x0 + x1) / 2, "Y": (y0 + y1) / 2,
+                     "Width": x1 - x0, "Height": y1 - y0})
+    return pd.DataFrame(rows, columns=["Symbol", "Parts", "X", "Y", "Width", "Height"])
+
+
+# ✅ FUNCTION: Text Lines with Position and Size
+def page_labels(page):
+    """Text lines of a page with their centre and font size."""
+    rows = []
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                x0, y0, x1, y1 = line["bbox"]
+                rows.append({"Text": text, "X": (x0 + x1) / 2, "Y": (y0 + y1) / 2,
+                             "Size": max(span["size"] for span in line["spans"])})
+    return pd.DataFrame(rows, columns=["Text", "X", "Y", "Size"])
+
+
+def _connector_code(text):
+    match = CONNECTOR_CODE.search(text)
+    return match.group(1).upper() if match else ""
+
+
+def is_room_label(text):
+    """True for text that reads like a room name (not a dimension, tag, connector code or floor title)."""
+    return (len(re.findall(r"[A-Za-z]", text)) >= 2 and len(text) <= 40 and not _connector_code(text)
+            and not parse_dimensions(text) and not FLOOR_NAME.search(text))
+
+
+def _is_callout(text):
+    return bool(_connector_code(text) or CALLOUT_TAG.match(text.strip().upper()))
+
+
+# ✅ FUNCTION: Floor Level of a Sheet
+def floor_level(labels, page_number):
+    """First floor name in the largest text of the sheet (e.g. SECOND FLOOR PLAN), else 'Page N'."""
+    for text in labels.sort_values("Size", ascending=False, kind="stable")["Text"]:
+        match = FLOOR_NAME.search(text)
+        if match:
+            return f"{match.group(1).capitalize()} Floor"
+    return f"Page {page_number}"
+
+
+# ✅ FUNCTION: Assign Points to Named Rooms
+def assign_rooms(px, py, labels, boundaries, area_column="Gross Area (sq ft)", margin=0.0):
+    """Room name for each point: the largest label of the smallest labelled boundary holding the point.
+
+    Boundaries without a label are ignored, and `margin` grows the bounds so
+    points on a wall centerline still fall inside the room the wall encloses.
+    """
+    names = np.full(len(px), UNASSIGNED, dtype=object)
+    if boundaries.empty or labels.empty or len(names) == 0:
+        return names
+
+    candidates = labels[labels["Text"].map(is_room_label)]
+    label_index = locate_points(candidates["X"], candidates["Y"], boundaries, area_column=area_column)
+    room_names = {}
+    for k in np.argsort(-candidates["Size"].to_numpy(dtype=float), kind="stable"):
+        if label_index[k] >= 0:
+            room_names.setdefault(label_index[k], candidates["Text"].iat[k])
+
+    if not room_names:
+        return names
+    labelled = list(room_names)
+    rooms = boundaries.iloc[labelled].reset_index(drop=True)
+    rooms[["Min X", "Min Y"]] -= margin
+    rooms[["Max X", "Max Y"]] += margin
+    for k, room in enumerate(locate_points(px, py, rooms, area_column=area_column)):
+        if room >= 0:
+            names[k] = room_names[labelled[room]]
+    return names
+
+
+# ✅ FUNCTION: Link Symbols to Callout Text
+def link_callouts(px, py, labels, radius, chunk_size=256):
+    """Nearest connector code within `radius` of each point, else the nearest tag such as D1 or W-3."""
+    px = np.asarray(px, dtype=float)
+    py = np.asarray(py, dtype=float)
+    callouts = np.full(len(px), "", dtype=object)
+    if labels.empty or len(px) == 0:
+        return callouts
+
+    text = labels["Text"].to_numpy(dtype=object)
+    codes = np.array([_connector_code(t) for t in text], dtype=object)
+    tags = np.array([t.strip().upper() if _is_callout(t) else "" for t in text], dtype=object)
+    lx = labels["X"].to_numpy(dtype=float)
+    ly = labels["Y"].to_numpy(dtype=float)
+
+    for start in range(0, len(px), chunk_size):
+        distance = np.hypot(px[start:start + chunk_size, None] - lx, py[start:start + chunk_size, None] - ly)
+        chunk = callouts[start:start + chunk_size]
+        for values in (codes, tags):
+            masked = np.where((values != "") & (distance <= radius), distance, np.inf)
+            best = np.argmin(masked, axis=1)
+            hit = np.isfinite(masked[np.arange(len(best)), best]) & (chunk == "")
+            chunk[hit] = values[best[hit]]
+    return callouts
+
+
+def _spread_callouts(instances):
+    """Give untagged instances the callout most often linked to the same symbol."""
+    tagged = instances[instances["Callout"] != ""]
+    if tagged.empty:
+        return instances
+    common = tagged.groupby("Symbol")["Callout"].agg(lambda s: s.mode().iat[0])
+    blank = instances["Callout"] == ""
+    instances.loc[blank, "Callout"] = instances.loc[blank, "Symbol"].map(common).fillna("")
+    return instances
+
+
+# ✅ FUNCTION: Count Symbols per Floor and Room
+def summarize_symbols(instances):
+    if instances.empty:
+        return pd.DataFrame(columns=COUNT_COLUMNS)
+    return (instances.groupby(COUNT_COLUMNS[:-1], sort=False).size().rename("Count").reset_index()
+            .sort_values(["Floor Level", "Room Name", "Count"], ascending=[True, True, False])
+            .reset_index(drop=True))
+
+
+# ✅ FUNCTION: Symbol Counts as Estimation Rows
+def symbol_rows(counts):
+    """Turn labelled symbol counts into the same rows the schedule parser and LLM produce."""
+    labelled = counts[counts["Callout"] != ""]
+    df = pd.DataFrame({
+        "Floor Level": labelled["Floor Level"],
+        "Room Name": labelled["Room Name"],
+        "Area (sq ft)": None,
+        "Ceiling Height (ft)": None,
+        "Material": labelled["Callout"],
+        "Material Type": ["Connector" if _connector_code(c) else "Symbol" for c in labelled["Callout"]],
+        "Count": labelled["Count"],
+        "Estimated Quantity": None,
+        "Unit of Measure": "each",
+    }, columns=OUTPUT_COLUMNS)
+    return df.reset_index(drop=True)
+
+
+def _room_sized(paths, page):
+    """Closed paths (bounds in points) big enough to be rooms, without sheet borders or duplicates."""
+    width, height = paths["Max X"] - paths["Min X"], paths["Max Y"] - paths["Min Y"]
+    page_area = page.rect.width * page.rect.height
+    keep = ((width >= ROOM_MIN_SIDE_PT) & (height >= ROOM_MIN_SIDE_PT)
+            & (width * height <= ROOM_MAX_PAGE_FRACTION * page_area))
+    keep &= ~paths[BOUNDS_COLUMNS].round(1).duplicated()  # Fill and stroke of one outline
+    return paths[keep].reset_index(drop=True)
+
+
+def _outermost(paths):
+    """Paths whose bounds are not inside another path's bounds."""
+    min_x, min_y, max_x, max_y = (paths[c].to_numpy(dtype=float)[:, None] for c in BOUNDS_COLUMNS)
+    inside = (min_x >= min_x.T) & (min_y >= min_y.T) & (max_x <= max_x.T) & (max_y <= max_y.T)
+    np.fill_diagonal(inside, False)
+    return paths[~inside.any(axis=1)].reset_index(drop=True)
+
+
+# ✅ FUNCTION: Room-Sized Closed Paths of a Page
+def room_boundaries(rings, page):
+    """Closed paths big enough to be rooms; 'Area (sq ft)' holds square points here."""
+    return _room_sized(compute_page_areas(rings, 1.0), page)
+
+
+# ✅ FUNCTION: Named Room Areas of Measured Pages
+def room_areas(doc, area_df):
+    """One row per labelled room from the closed paths measure_pdf found (bounds in points).
+
+    Each room label names its smallest enclosing room-sized path, so sheet
+    borders, title blocks and nested outlines are not summed as floor area.
+    Pages without room labels keep their outermost room-sized paths, unassigned.
+    """
+    columns = ["Page", "Room Name", "Layer", "Area (sq ft)", "Perimeter (ft)"] + BOUNDS_COLUMNS
+    if area_df.empty:
+        return pd.DataFrame(columns=columns)
+    found = []
+    for page_number, paths in area_df.groupby("Page", sort=True):
+        page = doc[int(page_number) - 1]
+        paths = _room_sized(paths.reset_index(drop=True), page)
+        if paths.empty:
+            continue
+        labels = page_labels(page).sort_values("Size", ascending=False, kind="stable")
+        index = locate_points(labels["X"], labels["Y"], paths, area_column="Area (sq ft)")
+        named = pd.DataFrame({"Room Name": labels["Text"].to_numpy(), "Boundary": index})
+        named = named[(named["Boundary"] >= 0) & named["Room Name"].map(is_room_label)]
+        # Title blocks and legends: the scale note or a crowd of names inside one path
+        crowded = named["Boundary"].value_counts().loc[lambda counts: counts > MAX_ROOM_LABELS].index
+        titled = index[labels["Text"].map(parse_scale_note).notna().to_numpy()]
+        named = named[~named["Boundary"].isin(crowded) & ~named["Boundary"].isin(titled)]
+        named = named.drop_duplicates("Boundary")  # Largest label names the room
+        if named.empty:
+            untitled = paths.drop(index=[i for i in titled if i >= 0])
+            rooms = _outermost(untitled).assign(**{"Room Name": UNASSIGNED})
+        else:
+            rooms = paths.iloc[named["Boundary"]].assign(**{"Room Name": named["Room Name"].to_numpy()})
+        found.append(rooms)
+        print(f"🏠 Page {int(page_number)}: {len(rooms)} room areas ({rooms['Area (sq ft)'].sum():.1f} sq ft)")
+
+    if not found:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(found, ignore_index=True)[columns]
+
+
+# ✅ FUNCTION: Count Repeated Vector Symbols in a PDF
+def count_pdf_symbols(doc, pages=None):
+    """Find repeated vector glyphs on the pages of an open fitz document.
+
+    Returns (instances, counts) DataFrames. Signatures seen fewer than
+    MIN_REPEATS times in the whole document are dropped.
+    """
+    found = []
+    for page_number, page in enumerate(doc, start=1):
+        if pages is not None and page_number not in pages:
+            continue
+        drawings = page.get_drawings()
+        symbols = find_page_symbols(drawings)
+        if symbols.empty:
+            continue
+
+        labels = page_labels(page)
+        _, rings = read_page_geometry(page, drawings)
+        symbols["Page"] = page_number
+        symbols["Floor Level"] = floor_level(labels, page_number)
+        symbols["Room Name"] = assign_rooms(symbols["X"], symbols["Y"], labels, room_boundaries(rings, page),
+                                            area_column="Area (sq ft)")
+        symbols["Callout"] = link_callouts(symbols["X"], symbols["Y"], labels, CALLOUT_RADIUS_PT)
+        found.append(symbols)
+        print(f"🔣 Page {page_number}: {len(symbols)} symbol candidates, "
+              f"{symbols['Symbol'].nunique()} distinct signatures")
+
+    if not found:
+        return pd.DataFrame(columns=INSTANCE_COLUMNS), pd.DataFrame(columns=COUNT_COLUMNS)
+
+    instances = pd.concat(found, ignore_index=True)
+    repeats = instances["Symbol"].map(instances["Symbol"].value_counts())
+    instances = instances[repeats >= MIN_REPEATS].reset_index(drop=True)
+    instances["Block"] = ""
+    instances = _spread_callouts(instances)[INSTANCE_COLUMNS]
+    return instances, summarize_symbols(instances)
+
+
+def _entity_geometry(entity, depth, points, chords, kinds):
+    """Add the points, chords and kinds of a block entity (nested INSERTs exploded)."""
+    dxftype = entity.dxftype()
+    if dxftype == "LINE":
+        start, end = entity.dxf.start, entity.dxf.end
+        points.extend([(start.x, start.y), (end.x, end.y)])
+        chords.append(start.distance(end))
+        kinds.append("l")
+    elif dxftype == "LWPOLYLINE":
+        vertices = list(entity.get_points("xyb"))
+        pairs = list(zip(vertices, vertices[1:] + (vertices[:1] if entity.closed else [])))
+        points.extend((x, y) for x, y, _ in vertices)
+        for (x0, y0, bulge), (x1, y1, _) in pairs:
+            chords.append(np.hypot(x1 - x0, y1 - y0))
+            kinds.append("a" if bulge else "l")
+    elif dxftype == "POLYLINE":
+        vertices = [(p.x, p.y) for p in entity.points()]
+        points.extend(vertices)
+        for (x0, y0), (x1, y1) in zip(vertices, vertices[1:]):
+            chords.append(np.hypot(x1 - x0, y1 - y0))
+            kinds.append("l")
+    elif dxftype == "CIRCLE":
+        cx, cy, r = entity.dxf.center.x, entity.dxf.center.y, entity.dxf.radius
+        points.extend([(cx + r, cy), (cx, cy + r), (cx - r, cy), (cx, cy - r)])
+        chords.append(2 * r)
+        kinds.append("o")
+    elif dxftype == "ARC":
+        start, end = entity.start_point, entity.end_point
+        points.extend([(entity.dxf.center.x, entity.dxf.center.y), (start.x, start.y), (end.x, end.y)])
+        chords.append(start.distance(end))
+        kinds.append("a")
+    elif dxftype in ("SOLID", "HATCH"):
+        kinds.append("f")
+    elif dxftype == "INSERT" and depth < MAX_BLOCK_DEPTH:
+        for child in entity.virtual_entities():
+            _entity_geometry(child, depth + 1, points, chords, kinds)
+
+
+def block_signature(block):
+    """Geometric signature of a block definition (None for empty or point-like blocks)."""
+    points, chords, kinds = [], [], []
+    for entity in block:
+        _entity_geometry(entity, 0, points, chords, kinds)
+    return geometric_signature(points, chords, kinds)
+
+
+# ✅ FUNCTION: Count Block References in a DXF
+def count_dxf_symbols(dxf_path, room_df=None, area_df=None, scale_factor=1.0):
+    """Count INSERTs by the geometric signature of their block.
+
+    Blocks with identical geometry but different names (common after merging
+    drawings) share one signature. Rooms come from room labels and closed
+    boundaries; callouts from connector-code attributes, nearby text, or the
+    most used block name of the signature. Returns (instances, counts) DataFrames.
+
+    INSERTs are streamed from the modelspace; only the block definitions are
+    loaded (see read_dxf_blocks), and only if the drawing has INSERTs at all.
+    """
+    blocks = None
+    signatures = {}
+    rows = []
+    for insert in iter_modelspace(dxf_path, ("INSERT",)):
+        name = insert.dxf.name
+        if name not in signatures:
+            if blocks is None:
+                blocks = read_dxf_blocks(dxf_path).blocks
+            block = blocks.get(name)
+            signatures[name] = block_signature(block) if block is not None else None
+        if signatures[name] is None:
+            continue
+        callout = next((t for t in (a.dxf.text.strip().upper() for a in insert.attribs) if _is_callout(t)), "")
+        rows.append({"Page": None, "Floor Level": DEFAULT_FLOOR, "Symbol": signatures[name], "Block": name,
+                     "Parts": 1, "X": insert.dxf.insert.x, "Y": insert.dxf.insert.y,
+                     "Width": None, "Height": None, "Callout": callout})
+    if blocks is None:
+        print("⚠️ No block references in DXF; nothing to count.")
+        return pd.DataFrame(columns=INSTANCE_COLUMNS), pd.DataFrame(columns=COUNT_COLUMNS)
+
+    instances = pd.DataFrame(rows, columns=INSTANCE_COLUMNS)
+    labels = pd.DataFrame(columns=["Text", "X", "Y", "Size"])
+    if room_df is not None and not room_df.empty:
+        labels = room_df.rename(columns={"Room": "Text"}).assign(Size=1.0)
+    boundaries = area_df if area_df is not None else pd.DataFrame()
+    instances["Room Name"] = assign_rooms(instances["X"], instances["Y"], labels, boundaries)
+
+    blank = instances["Callout"] == ""
+    nearby = link_callouts(instances["X"], instances["Y"], labels, CALLOUT_RADIUS_FT / scale_factor)
+    instances.loc[blank, "Callout"] = nearby[blank.to_numpy()]
+    instances = _spread_callouts(instances)
+    # Still untagged: name the symbol after its most used block, so copies of one block count together
+    named = instances[~instances["Block"].str.startswith("*")]
+    canonical = named.groupby("Symbol")["Block"].agg(lambda s: s.mode().iat[0])
+    blank = instances["Callout"] == ""
+    instances.loc[blank, "Callout"] = instances.loc[blank, "Symbol"].map(canonical).fillna("")
+
+    print(f"🔣 {len(instances)} block references, {instances['Symbol'].nunique()} distinct signatures")
+    return instances, summarize_symbols(instances)
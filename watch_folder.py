@@ -0,0 +1,246 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import merge
+import service
+
+try:
+    from inotify_simple import INotify, flags  # Linux inotify (optional)
+except ImportError:
+    INotify = None
+
+# 🛠️ CONFIGURATION
+WATCH_FOLDER = "data"
+WATCH_OUTPUT_FOLDER = os.path.join("extracted_data", "watch")
+WATCH_EXTENSIONS = (".pdf", ".dxf")
+DEBOUNCE_S = 2.0        # A file must stay unchanged this long before it is processed
+POLL_INTERVAL_S = 1.0   # Event wait / folder scan interval
+STATE_FILE = "watch_state.json"
+HASH_CHUNK = 1 << 20
+
+
+def _signature(path):
+    """(size, mtime_ns) of a file, or None if it is gone."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FolderWatcher:
+    """Queue new or changed drawings from a folder through the estimation workers.
+
+    Events come from inotify when inotify_simple is installed, otherwise the
+    folder is polled by (size, mtime). A file is processed once it has been
+    quiet for DEBOUNCE_S; unchanged content (same SHA-256) is never re-run.
+    Each finished file publishes its outputs and refreshes the project report.
+    """
+
+    def __init__(self, input_folder=WATCH_FOLDER, output_folder=WATCH_OUTPUT_FOLDER,
+                 priority=service.DEFAULT_PRIORITY):
+        self.input_folder = input_folder
+        self.output_folder = output_folder
+        self.priority = priority
+        self.state_file = os.path.join(output_folder, STATE_FILE)
+        self.pending = {}    # name -> (last change time, signature)
+        self.running = set()
+        self.dirty = set()   # Changed again while running
+        self.lock = threading.RLock()  # Guards state, pending, running and dirty; held while saving
+        os.makedirs(output_folder, exist_ok=True)
+        self.state = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def _save_state(self):
+        with self.lock:
+            temp_file = self.state_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, indent=1)
+            os.replace(temp_file, self.state_file)
+
+    def _refresh_report(self):
+        """Regenerate the project report, or delete it when no drawing has outputs left."""
+        if merge.generate_report(self.output_folder) is None:
+            for name in ("final_project_report.csv", "final_project_report.xlsx"):
+                report_path = os.path.join(self.output_folder, name)
+                if os.path.exists(report_path):
+                    os.remove(report_path)
+
+    def _watched(self, name):
+        return name.lower().endswith(WATCH_EXTENSIONS) and not name.startswith(".")
+
+    # ✅ FUNCTION: Note a Possible Change
+    def touch(self, name):
+        if self._watched(name):
+            with self.lock:
+                self.pending[name] = (time.monotonic(), _signature(os.path.join(self.input_folder, name)))
+
+    # ✅ FUNCTION: Scan for Changes (startup and polling)
+    def scan(self):
+        """Mark files whose (size, mtime) differ from the last processed version, and deleted files."""
+        with self.lock:
+            known_signatures = {name: record.get("signature") for name, record in self.state.items()}
+        present = set()
+        for entry in os.scandir(self.input_folder):
+            if not entry.is_file() or not self._watched(entry.name):
+                continue
+            present.add(entry.name)
+            known = known_signatures.get(entry.name)
+            with self.lock:
+                waiting = entry.name in self.pending or entry.name in self.running
+            if not waiting and _signature(entry.path) != known:
+                self.touch(entry.name)
+        for name in set(known_signatures) - present:
+            with self.lock:
+                waiting = name in self.pending
+            if not waiting:
+                self.touch(name)
+
+    # ✅ FUNCTION: Queue Files That Have Settled
+    def process_settled(self):
+        now = time.monotonic()
+        with self.lock:
+            candidates = [(name, changed, signature) for name, (changed, signature) in self.pending.items()
+                          if now - changed >= DEBOUNCE_S]
+        for name, changed, signature in candidates:
+            current = _signature(os.path.join(self.input_folder, name))
+            with self.lock:
+                if current != signature:
+                    # Still being written (or replaced); wait for another quiet period
+                    self.pending[name] = (now, current)
+                    continue
+                del self.pending[name]
+                if name in self.running:
+                    self.dirty.add(name)
+                    continue
+            if current is None:
+                self._remove(name)
+            else:
+                self._consider(name, current)
+
+    def _consider(self, name, signature):
+        with self.lock:
+            record = self.state.get(name, {})
+            if record.get("signature") == signature:
+                return
+            known_digest = record.get("sha256")
+        path = os.path.join(self.input_folder, name)
+        digest = _sha256(path)
+        if known_digest == digest:
+            with self.lock:
+                self.state[name]["signature"] = signature
+                self._save_state()
+            print(f"⏭️ {name}: touched but content unchanged")
+            return
+
+        with self.lock:
+            self.running.add(name)
+        folder = os.path.join(self.output_folder, name)
+        service.queue_job(path, folder, self.priority,
+                          on_done=lambda job: self._finished(name, signature, digest, job))
+
+    # ✅ FUNCTION: Publish Outputs When a File Finishes
+    def _finished(self, name, signature, digest, job):
+        with self.lock:
+            published = self._publish(name, job["folder"]) if job["status"] != "failed" else []
+            self.state[name] = {
+                "signature": signature,
+                "sha256": digest,
+                "status": job["status"],
+                "error": job["error"],
+                "finished": job["finished"],
+                "outputs": job["folder"],
+                "published": published,
+            }
+            self._save_state()
+            self._refresh_report()
+            self.running.discard(name)
+            if name in self.dirty:
+                self.dirty.discard(name)
+                self.pending[name] = (0.0, _signature(os.path.join(self.input_folder, name)))
+        print(f"📤 {name}: {job['status']}, outputs in {job['folder']}")
+
+    def _publish(self, name, folder):
+        """Copy the report inputs of one file into the summary folder under a per-file prefix."""
+        prefix = name.replace(".", "_")
+        published = []
+        for suffix in merge.REPORT_PARTS.values():
+            matches = [f for f in os.listdir(folder) if f.endswith(suffix) or f == suffix[1:]]
+            if matches:
+                newest = max(matches, key=lambda f: os.path.getmtime(os.path.join(folder, f)))
+                target = f"{prefix}{suffix}"
+                shutil.copyfile(os.path.join(folder, newest), os.path.join(self.output_folder, target))
+                published.append(target)
+        return published
+
+    def _remove(self, name):
+        with self.lock:
+            record = self.state.pop(name, None)
+            if record is None:
+                return
+            for target in record.get("published", []):
+                target_path = os.path.join(self.output_folder, target)
+                if os.path.exists(target_path):
+                    os.remove(target_path)
+            self._save_state()
+            self._refresh_report()
+        print(f"🗑️ {name}: removed from the project summary")
+
+    # ✅ FUNCTION: Watch Until Interrupted
+    def run(self, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        self.scan()  # Catch up on files added or changed while not watching
+
+        inotify = None
+        if INotify is not None:
+            inotify = INotify()
+            inotify.add_watch(self.input_folder, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+                              | flags.MODIFY | flags.DELETE | flags.MOVED_FROM)
+        print(f"👀 Watching {self.input_folder} ({'inotify' if inotify else 'polling'}), "
+              f"outputs in {self.output_folder}")
+
+        try:
+            while not stop_event.is_set():
+                if inotify is not None:
+                    for event in inotify.read(timeout=int(POLL_INTERVAL_S * 1000)):
+                        self.touch(event.name)
+                else:
+                    stop_event.wait(POLL_INTERVAL_S)
+                    self.scan()
+                self.process_settled()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+
+# ✅ MAIN EXECUTION
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate drawings as they arrive in a folder")
+    parser.add_argument("--input", default=WATCH_FOLDER)
+    parser.add_argument("--output", default=WATCH_OUTPUT_FOLDER)
+    parser.add_argument("--workers", type=int, default=service.DEFAULT_WORKERS, help="concurrent files")
+    parser.add_argument("--rates", help="CSV with Material,Rate columns (per 100 sq ft)")
+    parser.add_argument("--no-yolo", action="store_true", help="skip preloading the YOLO model")
+    args = parser.parse_args()
+
+    service.warm_up(args.rates, yolo=not args.no_yolo)
+    service.start_workers(args.workers)
+    try:
+        FolderWatcher(args.input, args.output).run()
+    except KeyboardInterrupt:
+        print("🛑 Watch stopped.")